@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+"""
+Recorded wiki corpus for offline benchmarks, and a local server replaying it.
+
+    python bench/corpus.py record       # crawl the live wiki once and save every response
+    python bench/corpus.py synthesize   # build a corpus from output/items_data.json, no network
+
+A corpus is a directory holding index.json and one file per response body.
+index.json maps each request (path and sorted query) to its body, content
+type and kind ('category', 'item', 'image' or 'api'), and keeps the latest
+revision of every page so revision lookups can be answered for any batch.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+CORPUS_DIR = os.path.join(REPO_DIR, 'bench', 'corpus')
+ITEMS_JSON = os.path.join(REPO_DIR, 'output', 'items_data.json')
+SYNTHETIC_IMAGE_SIZE = 256
+
+def request_key(path, query=''):
+    """Key a request by its decoded path and sorted query, so parameter order never matters"""
+    params = sorted((key, value) for key, value in parse_qsl(query) if key not in ('format', 'formatversion'))
+    return unquote(path) + ('?' + urlencode(params) if params else '')
+
+
+class Corpus:
+    """Response bodies on disk, indexed by request"""
+
+    def __init__(self, corpus_dir):
+        self.corpus_dir = corpus_dir
+        self.index_path = os.path.join(corpus_dir, 'index.json')
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.kind = index.get('kind')
+        self.entries = index.get('entries', {})
+        self.revisions = index.get('revisions', {})
+        self.redirects = index.get('redirects', {})
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, body, content_type, kind):
+        digest = hashlib.sha1(body).hexdigest()
+        path = os.path.join(self.corpus_dir, digest[:2], digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(body)
+            self.entries[key] = {'file': f"{digest[:2]}/{digest}", 'content_type': content_type, 'kind': kind}
+
+    def body(self, key):
+        with open(os.path.join(self.corpus_dir, self.entries[key]['file']), 'rb') as f:
+            return f.read()
+
+    def keys(self, kind):
+        return sorted(key for key, entry in self.entries.items() if entry['kind'] == kind)
+
+    def digest(self):
+        """Fingerprint of the corpus contents, to tell results from different corpora apart"""
+        return hashlib.sha1(json.dumps(self.entries, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def save(self, kind):
+        self.kind = kind
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'kind': kind, 'entries': self.entries, 'revisions': self.revisions,
+                       'redirects': self.redirects}, f, indent=1, sort_keys=True)
+
+    def api_answer(self, params):
+        """Answer api.php, from a recorded response or, for revision lookups, the revision table"""
+        key = request_key('/w/api.php', urlencode(params))
+        if key in self.entries:
+            return self.body(key)
+        if params.get('prop') != 'revisions':
+            return None
+        query = {'pages': []}
+        for title in params.get('titles', '').split('|'):
+            if params.get('redirects') and title in self.redirects:
+                query.setdefault('redirects', []).append({'from': title, 'to': self.redirects[title]})
+                title = self.redirects[title]
+            if title in self.revisions:
+                query['pages'].append({'ns': 0, 'title': title, 'revisions': [{'revid': self.revisions[title]}]})
+            else:
+                query['pages'].append({'ns': 0, 'title': title, 'missing': True})
+        return json.dumps({'batchcomplete': True, 'query': query}).encode('utf-8')
+
+
+class ReplayServer:
+    """Serve a corpus over HTTP on localhost, with ETags and optional latency"""
+
+    def __init__(self, corpus, latency=0.0):
+        self.corpus = corpus
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self.misses = []
+        self._lock = threading.Lock()
+        handler = type('Handler', (ReplayHandler,), {'replay': self})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.misses = []
+
+    def record(self, sent, miss=None):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            if miss:
+                self.misses.append(miss)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    replay = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.replay.latency)
+        parts = urlsplit(self.path)
+        corpus = self.replay.corpus
+        if parts.path == '/w/api.php':
+            body = corpus.api_answer(dict(parse_qsl(parts.query)))
+            content_type = 'application/json; charset=utf-8'
+        else:
+            key = request_key(parts.path, parts.query)
+            entry = corpus.entries.get(key)
+            body = corpus.body(key) if entry else None
+            content_type = entry['content_type'] if entry else None
+        if body is None:
+            self.replay.record(0, self.path)
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.replay.record(0)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.replay.record(len(body))
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def pointed_at(base_url, offline=True):
+    """Point scrape.py at base_url for the duration; with offline, refuse any other host"""
+    import requests
+    import scrape
+    from unittest import mock
+
+    host = urlsplit(base_url).netloc
+    original_request = requests.Session.request
+
+    def local_only(self, method, url, *args, **kwargs):
+        if urlsplit(url).netloc != host:
+            raise RuntimeError(f"benchmark tried to reach {url} outside the corpus")
+        return original_request(self, method, url, *args, **kwargs)
+
+    categories = {name: base_url + url[len(scrape.BASE_URL):] for name, url in scrape.CATEGORIES.items()}
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(scrape, 'BASE_URL', base_url))
+        stack.enter_context(mock.patch.object(scrape, 'API_URL', f'{base_url}/w/api.php'))
+        stack.enter_context(mock.patch.object(scrape, 'CATEGORIES', categories))
+        if offline:
+            stack.enter_context(mock.patch.object(requests.Session, 'request', local_only))
+        yield
+
+
+def record(corpus_dir):
+    """Crawl the live wiki with scrape.main, saving every response it gets"""
+    import requests
+    import scrape
+    from unittest import mock
+
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    corpus = Corpus(corpus_dir)
+    category_paths = {urlsplit(url).path for url in scrape.CATEGORIES.values()}
+    original_request = requests.Session.request
+
+    def recording_request(self, method, url, *args, **kwargs):
+        response = original_request(self, method, url, *args, **kwargs)
+        if method == 'GET' and response.status_code == 200:
+            # Keyed by the URL asked for, which is what a replayed crawl asks for again
+            parts = urlsplit(url)
+            params = dict(kwargs.get('params') or {})
+            key = request_key(parts.path, '&'.join(filter(None, (parts.query, urlencode(params)))))
+            if parts.path == '/w/api.php':
+                add_revisions(corpus, response.json())
+                if params.get('prop') != 'revisions':
+                    corpus.add(key, response.content, response.headers.get('Content-Type'), 'api')
+            else:
+                content_type = response.headers.get('Content-Type') or ''
+                kind = ('image' if content_type.startswith('image/')
+                        else 'category' if parts.path in category_paths else 'item')
+                corpus.add(key, response.content, content_type, kind)
+        return response
+
+    work_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        with mock.patch.object(requests.Session, 'request', recording_request):
+            scrape.main(use_cache=False)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    corpus.save('recorded')
+    return corpus
+
+def add_revisions(corpus, data):
+    query = data.get('query', {})
+    for redirect in query.get('redirects', []):
+        corpus.redirects[redirect['from']] = redirect['to']
+    for page in query.get('pages', []):
+        if page.get('revisions'):
+            corpus.revisions[page['title']] = page['revisions'][0]['revid']
+
+
+def synthetic_png(seed, size=SYNTHETIC_IMAGE_SIZE):
+    """A size x size RGBA PNG of 16px colour tiles, written with the standard library only"""
+    row = bytearray(bytes((seed[0], 0, 0, 255)) * size)
+    row[2::4] = bytes((seed[2] + x // 16 * 24) & 255 for x in range(size))
+    rows = []
+    for y in range(size):
+        row[1::4] = bytes(((seed[1] + y // 16 * 24) & 255,)) * size
+        rows.append(b'\x00' + bytes(row))
+    rows = b''.join(rows)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+    header = struct.pack('>IIBBBBB', size, size, 8, 6, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows, 6)) + chunk(b'IEND', b'')
+
+# Page chrome around the article, so parsing pays for the skin as on the real wiki
+SKIN = ('<div id="mw-navigation">'
+        + ''.join(f'<div class="vector-menu"><a href="/wiki/Nav_{i}" title="Nav {i}">Nav {i}</a></div>' for i in range(300))
+        + '</div>')
+
+def article(content):
+    return (f'<!DOCTYPE html><html><head><title>Arc Raiders Wiki</title></head><body>{SKIN}'
+            f'<div id="content"><div id="mw-content-text"><div class="mw-parser-output">{content}</div></div></div>'
+            '</body></html>').encode('utf-8')
+
+def item_link(item):
+    return f'<a href="{urlsplit(item["url"]).path}" title="{item["name"]}">{item["name"]}</a>'
+
+def item_article(item):
+    """Rebuild an item page in the wiki's infobox markup from its scraped fields"""
+    rarity = item.get('Rarity', 'Common')
+    tag = {'Grenades': 'Grenade', 'Trinkets': 'Trinket', 'Weapons': 'Weapon', 'Augments': 'Augment',
+           'Shields': 'Shield', 'Traps': 'Trap'}.get(item['category'], item['category'])
+    rows = [f'<tr class="data-tag icon"><td><img src="/w/images/icon.png"></td></tr>',
+            f'<tr class="data-tag data-tag-{rarity.lower()}"><td>{rarity}</td></tr>',
+            f'<tr class="data-tag"><td>{tag}</td></tr>']
+    skip = {'name', 'url', 'category', 'Rarity', 'background_color', 'image_url', 'image_path', 'image_gradient',
+            'revision_id', 'normalized', 'Sell Price All Levels'}
+    for key, value in item.items():
+        if key in skip or not isinstance(value, str):
+            continue
+        if key == 'Sell Price':
+            levels = (item.get('Sell Price All Levels') or value).split(',')
+            prices = ''.join(f'<div class="template-price">{int(level):,}</div>' for level in levels if level.isdigit())
+            rows.append(f'<tr><th>{key}</th><td>{prices or value}</td></tr>')
+        else:
+            rows.append(f'<tr><th>{key}</th><td>{value}</td></tr>')
+    image = ''
+    if 'image_url' in item:
+        style = item.get('image_gradient', 'background: linear-gradient(#333, #111)')
+        image = f'<tr><td><span style="{style}"><img src="{urlsplit(item["image_url"]).path}"></span></td></tr>'
+    prose = ''.join(f'<p>{item["name"]} is an item found across the map. ' * 8 + '</p>' for _ in range(12))
+    return article(f'<table class="infobox">{image}{"".join(rows)}</table>{prose}')
+
+def synthesize(corpus_dir, items_json=ITEMS_JSON):
+    """Build a corpus offline from a previous scrape's items_data.json"""
+    import scrape
+
+    with open(items_json, 'r', encoding='utf-8') as f:
+        items_data = json.load(f)
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    corpus = Corpus(corpus_dir)
+    seen = {}
+    for items in items_data.values():
+        for item in items:
+            seen.setdefault(item['url'], item)
+
+    for name, url in scrape.CATEGORIES.items():
+        path = urlsplit(url).path
+        listed = [item for item in seen.values() if item['category'] == name]
+        if 'Category:' in path:
+            links = ''.join(f'<li>{item_link(item)}</li>' for item in listed)
+            body = article('')[:-len('</body></html>')] + (
+                f'<div id="mw-pages"><ul>{links}</ul></div></body></html>').encode('utf-8')
+        else:
+            rows = ''.join(f'<tr><td>{item_link(item)}</td><td>{item.get("Rarity", "")}</td></tr>' for item in listed)
+            body = article(f'<table class="wikitable"><tr><th>Name</th><th>Rarity</th></tr>{rows}</table>')
+        corpus.add(request_key(path), body, 'text/html; charset=UTF-8', 'category')
+
+    for index, item in enumerate(seen.values()):
+        path = urlsplit(item['url']).path
+        corpus.add(request_key(path), item_article(item), 'text/html; charset=UTF-8', 'item')
+        corpus.revisions[scrape.page_title(item['url'])] = item.get('revision_id', 1000 + index)
+        if 'image_url' in item:
+            image_path = urlsplit(item['image_url']).path
+            seed = hashlib.sha1(image_path.encode('utf-8')).digest()
+            corpus.add(request_key(image_path), synthetic_png(seed), 'image/png', 'image')
+    corpus.save('synthetic')
+    return corpus
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """Open the corpus, synthesizing one from items_data.json if none was recorded"""
+    corpus = Corpus(corpus_dir)
+    if not corpus.entries:
+        print(f"No corpus in {corpus_dir}, synthesizing one from {ITEMS_JSON}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            corpus = synthesize(corpus_dir)
+    return corpus
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record or synthesize the offline benchmark corpus")
+    parser.add_argument('action', choices=('record', 'synthesize'),
+                        help="'record' crawls the live wiki once; 'synthesize' builds pages from items_data.json")
+    parser.add_argument('--corpus', default=CORPUS_DIR,
+                        help=f"corpus directory (default: {os.path.relpath(CORPUS_DIR, REPO_DIR)})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = record(args.corpus) if args.action == 'record' else synthesize(args.corpus)
+    counts = {kind: len(corpus.keys(kind)) for kind in ('category', 'item', 'image', 'api')}
+    print(f"Corpus ({corpus.kind}): {len(corpus)} responses {counts}, "
+          f"{len(corpus.revisions)} revisions, saved to {args.corpus}")
+
+if __name__ == "__main__":
+    main()
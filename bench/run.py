@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+Offline benchmarks for the scraper and the page generator.
+
+    python bench/run.py                           # run everything, write bench/results/<time>-<commit>.json
+    python bench/run.py --compare OLD.json NEW.json
+
+Everything runs against bench/corpus, replayed by a local server; any
+request to another host fails the run. Without a recorded corpus one is
+synthesized from output/items_data.json (see bench/corpus.py).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import CORPUS_DIR, ReplayServer, load_corpus, pointed_at
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_WORKER_COUNTS = (1, 4, 8, 16)
+# Simulated round trip per request, so worker counts matter as they do online
+DEFAULT_LATENCY = 0.02
+# Starting rate high enough that the crawl measures the code, not the rate limiter
+DEFAULT_RATE = 1000.0
+GENERATE_VARIANTS = {
+    'default': {},
+    'compress': {'compress': True},
+    'full_size': {'thumbnails': False},
+}
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def timing_summary(seconds):
+    """Count, total and distribution of a list of per-page times"""
+    ordered = sorted(seconds)
+    return {
+        'pages': len(ordered),
+        'total_s': round(sum(ordered), 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+def best_of(repeats, function, *args):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_parse(corpus, repeats):
+    """Time extract_item_data per item page for each parser, and extract_category_links per listing"""
+    import scrape
+
+    pages = [(key, corpus.body(key).decode('utf-8')) for key in corpus.keys('item')]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for parser in scrape.PARSER_BACKENDS:
+            if parser == 'lxml' and scrape.lxml is None:
+                continue
+            results[parser] = timing_summary([
+                best_of(repeats, scrape.extract_item_data, html, scrape.BASE_URL + key,
+                        scrape.page_title(scrape.BASE_URL + key), 'Loot', parser)
+                for key, html in pages
+            ])
+        results['category_links'] = timing_summary([
+            best_of(repeats, scrape.extract_category_links, corpus.body(key).decode('utf-8'), scrape.BASE_URL + key)
+            for key in corpus.keys('category')
+        ])
+    return results
+
+def bench_crawl(corpus, worker_counts, latency, rate, work_dir):
+    """Run scrape.main end to end against the replayed corpus at each worker count"""
+    import scrape
+
+    results = []
+    for workers in worker_counts:
+        run_dir = os.path.join(work_dir, f'crawl-{workers}')
+        os.makedirs(run_dir)
+        with ReplayServer(corpus, latency) as server, pointed_at(server.base_url), \
+                contextlib.chdir(run_dir), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            items_data = scrape.main(workers=workers, use_cache=False, rate=rate)
+            elapsed = time.perf_counter() - started
+        if server.misses:
+            raise RuntimeError(f"corpus has no response for {len(server.misses)} requests, e.g. {server.misses[0]}")
+        items = sum(len(items) for items in items_data.values())
+        results.append({
+            'workers': workers,
+            'elapsed_s': round(elapsed, 3),
+            'items': items,
+            'requests': server.requests,
+            'bytes': server.bytes_sent,
+            'items_per_s': round(items / elapsed, 2),
+            'requests_per_s': round(server.requests / elapsed, 2),
+        })
+        print(f"  crawl with {workers} workers: {elapsed:.2f}s, {items / elapsed:.1f} items/s")
+    return results, os.path.join(work_dir, f'crawl-{worker_counts[-1]}', 'output')
+
+def generate_once(output_dir, options):
+    """Build the page once in this process and report time, peak memory and size"""
+    import resource
+    from generate_html import generate_html
+
+    with open(os.path.join(output_dir, 'items_data.json'), 'r', encoding='utf-8') as f:
+        items_data = json.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        html = generate_html(items_data, output_dir, **options)
+        elapsed = time.perf_counter() - started
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return {'seconds': round(elapsed, 3), 'peak_rss_mb': round(peak / 2 ** 20, 1),
+            'html_bytes': len(html.encode('utf-8'))}
+
+def bench_generate(crawl_output, work_dir):
+    """Time generate_html with an empty and then a filled thumbnail cache, each in a fresh process"""
+    results = {}
+    for name, options in GENERATE_VARIANTS.items():
+        output_dir = os.path.join(work_dir, f'generate-{name}')
+        os.makedirs(output_dir)
+        shutil.copy(os.path.join(crawl_output, 'items_data.json'), output_dir)
+        os.symlink(os.path.join(crawl_output, 'images'), os.path.join(output_dir, 'images'))
+        runs = {}
+        for run in ('cold', 'warm'):
+            completed = subprocess.run(
+                [sys.executable, __file__, '--generate-once', output_dir, json.dumps(options)],
+                capture_output=True, text=True, check=True)
+            runs[run] = json.loads(completed.stdout.splitlines()[-1])
+        results[name] = {
+            'cold_s': runs['cold']['seconds'],
+            'warm_s': runs['warm']['seconds'],
+            'peak_rss_mb': runs['cold']['peak_rss_mb'],
+            'html_bytes': runs['warm']['html_bytes'],
+        }
+        print(f"  generate {name}: cold {runs['cold']['seconds']:.2f}s, warm {runs['warm']['seconds']:.2f}s, "
+              f"{runs['warm']['html_bytes'] / 2 ** 20:.2f} MB")
+    return results
+
+def flatten(results, prefix=''):
+    """Numeric leaves of a results dict as {'parse.lxml.mean_ms': value, ...}"""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, list):
+            for entry in value:
+                flat.update(flatten({k: v for k, v in entry.items() if k != 'workers'},
+                                    f"{prefix}{key}.workers={entry['workers']}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+def compare(old_path, new_path, out=sys.stdout):
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    if old['meta'].get('corpus', {}).get('digest') != new['meta'].get('corpus', {}).get('digest'):
+        out.write("Warning: the two runs used different corpora\n")
+    old_flat = flatten(old['results'])
+    new_flat = flatten(new['results'])
+    width = max(len(key) for key in new_flat)
+    out.write(f"{'metric'.ljust(width)}  {'old':>12}  {'new':>12}  {'change':>8}\n")
+    for key in sorted(set(old_flat) | set(new_flat)):
+        before, after = old_flat.get(key), new_flat.get(key)
+        change = f"{(after - before) / before:+.1%}" if before and after is not None else ''
+        out.write(f"{key.ljust(width)}  {before if before is not None else '':>12}  "
+                  f"{after if after is not None else '':>12}  {change:>8}\n")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline scraper and generator benchmarks")
+    parser.add_argument('--corpus', default=CORPUS_DIR,
+                        help="corpus directory, synthesized from items_data.json if empty")
+    parser.add_argument('--workers', default=','.join(map(str, DEFAULT_WORKER_COUNTS)),
+                        help=f"comma-separated fetch worker counts for the crawl benchmark "
+                             f"(default: {','.join(map(str, DEFAULT_WORKER_COUNTS))})")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY,
+                        help=f"seconds the local server waits before each answer (default: {DEFAULT_LATENCY:g})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"starting requests per second of the crawl's rate limiter (default: {DEFAULT_RATE:g})")
+    parser.add_argument('--repeats', type=int, default=3,
+                        help="times each page is parsed, keeping the fastest (default: 3)")
+    parser.add_argument('--output', help="results file (default: bench/results/<time>-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="print the change in every metric between two results files and exit")
+    parser.add_argument('--generate-once', nargs=2, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.generate_once:
+        output_dir, options = args.generate_once
+        print(json.dumps(generate_once(output_dir, json.loads(options))))
+        return 0
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    worker_counts = [int(count) for count in args.workers.split(',')]
+    commit, dirty = git_commit()
+    print(f"Benchmarking {commit[:7] if commit else 'working tree'} against a {corpus.kind} corpus "
+          f"of {len(corpus.keys('item'))} pages and {len(corpus.keys('image'))} images")
+
+    work_dir = tempfile.mkdtemp(prefix='bench-')
+    try:
+        print("Parsing pages...")
+        parse = bench_parse(corpus, args.repeats)
+        for parser, summary in parse.items():
+            print(f"  {parser}: mean {summary['mean_ms']:.2f} ms, p95 {summary['p95_ms']:.2f} ms "
+                  f"over {summary['pages']} pages")
+        print("Crawling...")
+        crawl, crawl_output = bench_crawl(corpus, worker_counts, args.latency, args.rate, work_dir)
+        print("Generating pages...")
+        generate = bench_generate(crawl_output, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'corpus': {'kind': corpus.kind, 'digest': corpus.digest(), 'items': len(corpus.keys('item')),
+                       'images': len(corpus.keys('image'))},
+            'options': {'workers': worker_counts, 'latency': args.latency, 'rate': args.rate,
+                        'repeats': args.repeats},
+        },
+        'results': {'parse': parse, 'crawl': crawl, 'generate': generate},
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit[:7] if commit else 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class BuildCache:
+    """Content hashes of generate_html's inputs and a cache of encoded image blobs
+
+    manifest.json records the SHA-256 of every input file together with its
+    size and mtime, so a file whose stat is unchanged is not read again. It
+    also keeps the digest of the last build's inputs and the stat of the page
+    it produced, which lets a no-op regeneration return without writing.
+    Encoded blobs are stored as small JSON files named by a key derived from
+    the source image's hash.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.blobs_dir = os.path.join(cache_dir, 'blobs')
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self._lock = threading.Lock()
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.files = {}
+        self.used_blobs = set()
+        self.hits = 0
+        self.misses = 0
+
+    def file_hash(self, path):
+        """Return the SHA-256 of path, reusing the recorded one if its stat is unchanged"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.manifest.get('files', {}).get(path)
+        if not entry or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        with self._lock:
+            self.files[path] = entry
+        return entry['sha256']
+
+    def inputs_digest(self, paths, options):
+        """Combine the hashes of paths and the build options into one digest"""
+        combined = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+        for path in paths:
+            combined.update(f"{path}\0{self.file_hash(path)}\0".encode('utf-8'))
+        return combined.hexdigest()
+
+    def is_up_to_date(self, inputs_digest, output_path):
+        """True if the last build had the same inputs and its output is untouched"""
+        output = self.manifest.get('output')
+        if self.manifest.get('inputs') != inputs_digest or not output:
+            return False
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return False
+        return output['size'] == stat.st_size and output['mtime_ns'] == stat.st_mtime_ns
+
+    def load_blob(self, key):
+        path = os.path.join(self.blobs_dir, key + '.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                blob = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.used_blobs.add(key)
+        return blob
+
+    def store_blob(self, key, blob):
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        path = os.path.join(self.blobs_dir, key + '.json')
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(blob, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.used_blobs.add(key)
+
+    def save(self, inputs_digest, output_path):
+        """Record this build and delete blobs it did not use"""
+        stat = os.stat(output_path)
+        self.manifest = {
+            'inputs': inputs_digest,
+            'output': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+            'files': self.files,
+        }
+        if os.path.isdir(self.blobs_dir):
+            for filename in os.listdir(self.blobs_dir):
+                if filename.endswith('.json') and filename[:-5] not in self.used_blobs:
+                    os.remove(os.path.join(self.blobs_dir, filename))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def summary(self):
+        return f"{self.hits} cached blobs reused, {self.misses} encoded"
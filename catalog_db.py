@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from item_model import NormalizedItem
+
+CATALOG_DB = os.path.join('output', 'items.db')
+
+# Bumped whenever the tables or the normalized keys or values change; an older catalog
+# is rebuilt from scratch
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    url TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    rarity TEXT,
+    sell_price REAL,
+    stack_size REAL,
+    stack_value REAL,
+    weight REAL,
+    image_path TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    url TEXT NOT NULL REFERENCES items(url) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    raw TEXT,
+    number REAL,
+    unit TEXT,
+    value TEXT,
+    PRIMARY KEY (url, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_category ON items(category);
+CREATE INDEX IF NOT EXISTS items_rarity ON items(rarity);
+CREATE INDEX IF NOT EXISTS items_sell_price ON items(sell_price);
+CREATE INDEX IF NOT EXISTS items_stack_value ON items(stack_value);
+CREATE INDEX IF NOT EXISTS properties_key_number ON properties(key, number);
+"""
+
+def as_number(value):
+    """Return value as a float if it is a plain number, else None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # SQLite integers are 64-bit; REAL columns take any magnitude
+        return float(value)
+    return None
+
+def item_rows(category, item):
+    """Return the items row and the properties rows for one scraped item"""
+    record = NormalizedItem.from_item(item)
+    sell_price = as_number(record.get('sell_price'))
+    stack_size = as_number(record.get('stack_size'))
+    # Same rule as the page's stack value sort: a missing stack size counts as 1
+    stack_value = None if sell_price is None else sell_price * (1 if stack_size is None else stack_size)
+    digest = hashlib.sha256(json.dumps([category, item], sort_keys=True).encode('utf-8')).hexdigest()
+    item_row = (
+        item['url'], item.get('name') or '', category, record.get('rarity'),
+        sell_price, stack_size, stack_value, as_number(record.get('weight')),
+        item.get('image_path'), digest,
+    )
+    # Numbers are also stored in their own column so range queries can use the index
+    property_rows = [
+        (item['url'], key, record.raw.get(key), as_number(value), record.units.get(key), json.dumps(value))
+        for key, value in record.values.items()
+    ]
+    return item_row, property_rows
+
+def export_catalog(items_data, db_path=CATALOG_DB):
+    """Write items_data to the SQLite catalog, touching only changed items
+
+    Items are matched by URL and compared by content hash, so a later run
+    only rewrites items that were added or changed and deletes the ones no
+    longer listed. Everything happens in a single transaction.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute('PRAGMA foreign_keys = ON')
+        if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript('DROP TABLE IF EXISTS properties; DROP TABLE IF EXISTS items;')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        connection.executescript(SCHEMA)
+        with connection:
+            stored = dict(connection.execute('SELECT url, content_hash FROM items'))
+            seen = set()
+            written = 0
+            for category, items in items_data.items():
+                for item in items:
+                    if 'url' not in item or item['url'] in seen:
+                        continue
+                    seen.add(item['url'])
+                    item_row, property_rows = item_rows(category, item)
+                    if stored.get(item['url']) == item_row[-1]:
+                        continue
+                    # Replacing the item cascades to its old properties
+                    connection.execute('DELETE FROM items WHERE url = ?', (item['url'],))
+                    connection.execute('INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', item_row)
+                    connection.executemany('INSERT INTO properties VALUES (?, ?, ?, ?, ?, ?)', property_rows)
+                    written += 1
+            removed = [url for url in stored if url not in seen]
+            connection.executemany('DELETE FROM items WHERE url = ?', [(url,) for url in removed])
+    finally:
+        connection.close()
+    print(f"Catalog: {written} items written, {len(seen) - written} unchanged, "
+          f"{len(removed)} removed ({db_path})")
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+
+
+class CrawlJournal:
+    """Append-only JSONL record of the items a crawl has finished
+
+    Each item is written as one line as soon as it is scraped and flushed,
+    so an interrupted run loses at most the item being written. Resuming
+    loads the journal and lets the crawl skip every URL already in it; a
+    torn last line from a crash is ignored. A fresh run starts an empty
+    journal, and finish() removes it once the final JSON has been saved.
+    A fresh run refuses to overwrite the non-empty journal of an interrupted
+    one and raises FileExistsError instead.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.items = {}
+        if not resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            raise FileExistsError(f"{path} holds the progress of an interrupted run; "
+                                  f"use --resume to continue it or delete {path} to start over")
+        if resume:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            continue
+                        self.items[item['url']] = item
+            except OSError:
+                pass
+        self.resumed = len(self.items)
+        # Rewrite the journal with only its intact entries before appending
+        self._file = open(path, 'w', encoding='utf-8')
+        for item in self.items.values():
+            self._write(item)
+
+    def _write(self, item):
+        self._file.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def get(self, url):
+        return self.items.get(url)
+
+    def append(self, item):
+        with self._lock:
+            self.items[item['url']] = item
+            self._write(item)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def finish(self):
+        """Close and delete the journal once its items are saved elsewhere"""
+        self.close()
+        os.remove(self.path)
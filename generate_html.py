@@ -1,7 +1,173 @@
+import argparse
+import gzip
+import hashlib
+import io
 import json
 import os
+import re
+import time
 import base64
 
+from build_cache import BuildCache
+from catalog_db import export_catalog
+from item_model import canonical_key, item_values
+from metrics import REPORT_FILE, RunMetrics, write_report
+from thumbnails import THUMBNAIL_QUALITY, THUMBNAIL_SIZE, detect_image_mime, make_thumbnails
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Atlas tiles are packed at the 120px size .item-image is displayed at
+ATLAS_TILE_SIZE = 120
+ATLAS_COLUMNS = 16
+ATLAS_TILES_PER_SHEET = 256
+
+# Low-cardinality values the page filters on, each sent as one bitset per
+# value: the item category and these normalized keys
+FACET_KEYS = ('category', 'rarity', 'can_be_found_in')
+
+# Words the search index is built from; the page splits queries the same way
+SEARCH_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Source files whose changes invalidate the build cache
+TEMPLATE_FILES = [
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thumbnails.py'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'item_model.py'),
+]
+
+# Fallback for browsers without DecompressionStream: a minimal gzip/DEFLATE
+# decoder (RFC 1952/1951) following zlib's puff.c
+INFLATE_JS = """
+        const LENGTH_BASE = [3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31, 35, 43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258];
+        const LENGTH_EXTRA = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 0];
+        const DISTANCE_BASE = [1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193, 257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577];
+        const DISTANCE_EXTRA = [0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 13];
+        const CODE_LENGTH_ORDER = [16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15];
+        
+        function gunzip(data) {
+            let pos = 10;  // generate_html writes a bare 10-byte gzip header
+            let bitBuffer = 0;
+            let bitCount = 0;
+            let out = new Uint8Array(data.length * 4);
+            let outLength = 0;
+            
+            function bits(count) {
+                while (bitCount < count) {
+                    bitBuffer |= data[pos++] << bitCount;
+                    bitCount += 8;
+                }
+                const value = bitBuffer & ((1 << count) - 1);
+                bitBuffer >>>= count;
+                bitCount -= count;
+                return value;
+            }
+            
+            function ensure(extra) {
+                if (outLength + extra > out.length) {
+                    const grown = new Uint8Array(Math.max(out.length * 2, outLength + extra));
+                    grown.set(out.subarray(0, outLength));
+                    out = grown;
+                }
+            }
+            
+            // Canonical Huffman table: code counts per length and symbols in code order
+            function huffman(lengths) {
+                const counts = new Uint16Array(16);
+                const offsets = new Uint16Array(16);
+                const symbols = new Uint16Array(lengths.length);
+                lengths.forEach(length => counts[length]++);
+                counts[0] = 0;
+                for (let length = 1; length < 16; length++) {
+                    offsets[length] = offsets[length - 1] + counts[length - 1];
+                }
+                lengths.forEach((length, symbol) => {
+                    if (length) symbols[offsets[length]++] = symbol;
+                });
+                return { counts, symbols };
+            }
+            
+            function decode(table) {
+                let code = 0, first = 0, index = 0;
+                for (let length = 1; length < 16; length++) {
+                    code |= bits(1);
+                    const count = table.counts[length];
+                    if (code - count < first) return table.symbols[index + code - first];
+                    index += count;
+                    first = (first + count) << 1;
+                    code <<= 1;
+                }
+                throw new Error('Invalid compressed data');
+            }
+            
+            let last;
+            do {
+                last = bits(1);
+                const type = bits(2);
+                if (type === 0) {
+                    // Stored block: byte-aligned length, its complement, then raw bytes
+                    bitBuffer = bitCount = 0;
+                    const length = data[pos] | (data[pos + 1] << 8);
+                    pos += 4;
+                    ensure(length);
+                    out.set(data.subarray(pos, pos + length), outLength);
+                    outLength += length;
+                    pos += length;
+                    continue;
+                }
+                let literals, distances;
+                if (type === 1) {
+                    const lengths = new Array(288).fill(8, 0, 144).fill(9, 144, 256).fill(7, 256, 280).fill(8, 280);
+                    literals = huffman(lengths);
+                    distances = huffman(new Array(30).fill(5));
+                } else if (type === 2) {
+                    const literalCount = bits(5) + 257;
+                    const distanceCount = bits(5) + 1;
+                    const codeLengthCount = bits(4) + 4;
+                    const codeLengths = new Array(19).fill(0);
+                    for (let i = 0; i < codeLengthCount; i++) {
+                        codeLengths[CODE_LENGTH_ORDER[i]] = bits(3);
+                    }
+                    const codeLengthTable = huffman(codeLengths);
+                    const lengths = [];
+                    while (lengths.length < literalCount + distanceCount) {
+                        const symbol = decode(codeLengthTable);
+                        if (symbol < 16) {
+                            lengths.push(symbol);
+                        } else if (symbol === 16) {
+                            const previous = lengths[lengths.length - 1];
+                            for (let repeat = 3 + bits(2); repeat > 0; repeat--) lengths.push(previous);
+                        } else {
+                            for (let repeat = symbol === 17 ? 3 + bits(3) : 11 + bits(7); repeat > 0; repeat--) lengths.push(0);
+                        }
+                    }
+                    literals = huffman(lengths.slice(0, literalCount));
+                    distances = huffman(lengths.slice(literalCount));
+                } else {
+                    throw new Error('Invalid compressed data');
+                }
+                for (let symbol = decode(literals); symbol !== 256; symbol = decode(literals)) {
+                    if (symbol < 256) {
+                        ensure(1);
+                        out[outLength++] = symbol;
+                        continue;
+                    }
+                    symbol -= 257;
+                    const length = LENGTH_BASE[symbol] + bits(LENGTH_EXTRA[symbol]);
+                    const distanceSymbol = decode(distances);
+                    const distance = DISTANCE_BASE[distanceSymbol] + bits(DISTANCE_EXTRA[distanceSymbol]);
+                    ensure(length);
+                    for (let i = 0; i < length; i++, outLength++) {
+                        out[outLength] = out[outLength - distance];
+                    }
+                }
+            } while (!last);
+            return out.subarray(0, outLength);
+        }
+"""
+
 def load_image_as_base64(image_path):
     """Load an image file and convert it to base64"""
     try:
@@ -13,27 +179,323 @@ def load_image_as_base64(image_path):
         print(f"Error loading image {image_path}: {e}")
     return None
 
-def generate_html(items_data, output_dir='output'):
-    """Generate static HTML page with all item categories"""
+def parse_number(value):
+    """Parse a displayed value into a number the way the page's parseNumber() does"""
+    if not value:
+        return 0
+    match = re.match(r'-?(\d+(\.\d*)?|\.\d+)', re.sub(r'[^0-9.-]', '', str(value)))
+    return float(match.group(0)) if match else 0
+
+def build_sort_orders(items):
+    """Precompute the item order for every sort option in the page
+
+    items is the flat list the page indexes into. Returns a dict mapping each
+    sort option value to a list of item indices. Ties keep their original
+    order, matching the stable Array.prototype.sort the page used to run.
+    Prices and stack sizes come from the items' normalized values.
+    """
+    values = [item_values(item) for item in items]
+    
+    def number(i, key, default):
+        value = values[i].get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        # Values that did not normalize to a number sort by their raw string,
+        # read the way the page's parseNumber() reads it (e.g. "5x" is 5)
+        raw = next((v for label, v in items[i].items() if isinstance(v, str) and canonical_key(label) == key), None)
+        return default if raw is None else parse_number(raw)
+    
+    def name_key(i):
+        return (items[i].get('name') or '').lower()
+    
+    def sell_price(i):
+        return number(i, 'sell_price', 0)
+    
+    def stack_value(i):
+        return sell_price(i) * number(i, 'stack_size', 1)
+    
+    indices = range(len(items))
+    by_name = sorted(indices, key=name_key)
+    orders = {}
+    for order, reverse in (('asc', False), ('desc', True)):
+        orders[f'name-{order}'] = sorted(indices, key=name_key, reverse=reverse)
+        # Secondary sort by name stays ascending in both directions
+        orders[f'category-{order}'] = sorted(by_name, key=lambda i: (items[i].get('category') or '').lower(), reverse=reverse)
+        orders[f'sellprice-{order}'] = sorted(indices, key=sell_price, reverse=reverse)
+        orders[f'stackvalue-{order}'] = sorted(indices, key=stack_value, reverse=reverse)
+    return orders
+
+def search_tokens(text):
+    return SEARCH_TOKEN_PATTERN.findall(text.lower())
+
+def build_search_index(items):
+    """Map every word of the items' names, categories and text values to the items containing it
+
+    items is the flat list the page indexes into. Returns the words sorted,
+    and for each word the ascending indices of the items containing it. The
+    page finds the words starting with a typed prefix by binary search, so a
+    query never scans the items themselves. Numbers are left out; sorting
+    covers them.
+    """
+    postings = {}
+    for i, item in enumerate(items):
+        texts = [item.get('name') or '', item.get('category') or '']
+        for value in item_values(item).values():
+            if isinstance(value, str):
+                texts.append(value)
+            elif isinstance(value, list):
+                texts.extend(entry for entry in value if isinstance(entry, str))
+        for text in texts:
+            for token in search_tokens(text):
+                indices = postings.setdefault(token, [])
+                if not indices or indices[-1] != i:
+                    indices.append(i)
+    tokens = sorted(postings)
+    return {'tokens': tokens, 'postings': [postings[token] for token in tokens]}
+
+def encode_bitset(indices, size):
+    """Base64 of a bitset over `size` items as little-endian 32-bit words, bit i for item i"""
+    bits = 0
+    for i in indices:
+        bits |= 1 << i
+    return base64.b64encode(bits.to_bytes(4 * ((size + 31) // 32), 'little')).decode('ascii')
+
+def build_facet_bitsets(items):
+    """Bitsets over the flat item list for every value of every facet in FACET_KEYS
+
+    Returns {facet: {'values': {value: bitset}, 'missing': bitset}}, the
+    missing bitset marking the items without a value for the facet. Category
+    values keep the order of the categories; others are sorted.
+    """
+    facets = {}
+    for facet in FACET_KEYS:
+        values = {}
+        missing = []
+        for i, item in enumerate(items):
+            value = item.get('category') if facet == 'category' else item_values(item).get(facet)
+            if isinstance(value, str):
+                value = [value]
+            elif not isinstance(value, list):
+                value = []
+            value = [entry for entry in value if isinstance(entry, str)]
+            for entry in value:
+                values.setdefault(entry, []).append(i)
+            if not value:
+                missing.append(i)
+        names = list(values) if facet == 'category' else sorted(values)
+        facets[facet] = {
+            'values': {name: encode_bitset(values[name], len(items)) for name in names},
+            'missing': encode_bitset(missing, len(items)),
+        }
+    return facets
+
+def encode_image(image_path, thumbs_dir, thumbnails):
+    """Return an item image as {'mime', '1x'[, '2x']} base64 payloads, or None"""
+    if thumbnails:
+        # 1x/2x display-size renditions instead of the full wiki image
+        renditions = make_thumbnails(image_path, thumbs_dir)
+        if not renditions:
+            return None
+        encoded = {'mime': renditions[1][0]}
+        for scale, (_, data) in renditions.items():
+            encoded[f'{scale}x'] = base64.b64encode(data).decode('utf-8')
+        return encoded
+    base64_data = load_image_as_base64(image_path)
+    if not base64_data:
+        return None
+    return {'mime': detect_image_mime(base64.b64decode(base64_data[:24])), '1x': base64_data}
+
+def build_atlas(image_paths):
+    """Pack images into sprite sheets of display-size tiles
+
+    Returns the base64-encoded WebP sheets and a dict mapping each image path
+    to its [sheet, x, y] tile position. Images are scaled to fit the tile and
+    centered, like object-fit: contain.
+    """
+    sheets = []
+    tiles = {}
+    unique_paths = [path for path in dict.fromkeys(image_paths) if os.path.exists(path)]
+    for start in range(0, len(unique_paths), ATLAS_TILES_PER_SHEET):
+        batch = unique_paths[start:start + ATLAS_TILES_PER_SHEET]
+        rows = (len(batch) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+        sheet = Image.new('RGBA', (min(len(batch), ATLAS_COLUMNS) * ATLAS_TILE_SIZE, rows * ATLAS_TILE_SIZE))
+        for index, path in enumerate(batch):
+            try:
+                with Image.open(path) as image:
+                    tile = image.convert('RGBA')
+            except Exception as e:
+                print(f"Error loading image {path}: {e}")
+                continue
+            tile.thumbnail((ATLAS_TILE_SIZE, ATLAS_TILE_SIZE), Image.LANCZOS)
+            x = (index % ATLAS_COLUMNS) * ATLAS_TILE_SIZE
+            y = (index // ATLAS_COLUMNS) * ATLAS_TILE_SIZE
+            sheet.paste(tile, (x + (ATLAS_TILE_SIZE - tile.width) // 2, y + (ATLAS_TILE_SIZE - tile.height) // 2))
+            tiles[path] = [len(sheets), x, y]
+        buffer = io.BytesIO()
+        sheet.save(buffer, 'WEBP', quality=85)
+        sheets.append(base64.b64encode(buffer.getvalue()).decode('utf-8'))
+    return sheets, tiles
+
+def generate_html(items_data, output_dir='output', atlas=False, thumbnails=True, compress=False, build_cache=None,
+                  metrics=None):
+    """Generate static HTML page with all item categories
+    
+    With a BuildCache, encoded images and atlas sheets are reused for source
+    images whose content has not changed. Phase and image encode timings and
+    the output sizes are recorded in `metrics` when a RunMetrics is given.
+    """
+    
+    if metrics is None:
+        metrics = RunMetrics('generate')
+    thumbs_dir = os.path.join(output_dir, 'thumbs')
+    
+    if atlas and Image is None:
+        raise RuntimeError("Atlas mode requires Pillow (pip install Pillow)")
+    
+    atlas_sheets, atlas_tiles = [], {}
+    if atlas:
+        with metrics.phase('atlas'):
+            image_paths = [
+                os.path.join(output_dir, item['image_path'])
+                for items in items_data.values() for item in items if 'image_path' in item
+            ]
+            if build_cache is None:
+                atlas_sheets, atlas_tiles = build_atlas(image_paths)
+            else:
+                digests = hashlib.sha256(json.dumps([[path, build_cache.file_hash(path)] for path in image_paths]).encode('utf-8'))
+                key = f"atlas-{digests.hexdigest()}-{ATLAS_TILE_SIZE}px"
+                blob = build_cache.load_blob(key)
+                if blob is None:
+                    blob = dict(zip(('sheets', 'tiles'), build_atlas(image_paths)))
+                    build_cache.store_blob(key, blob)
+                atlas_sheets, atlas_tiles = blob['sheets'], blob['tiles']
+        # Compare with the base64 each card would embed on its own
+        per_image_size = sum(4 * ((os.path.getsize(path) + 2) // 3) for path in image_paths if os.path.exists(path))
+        atlas_size = sum(len(sheet) for sheet in atlas_sheets)
+        print(f"Atlas: {len(atlas_tiles)} tiles in {len(atlas_sheets)} sheet(s), "
+              f"{atlas_size / 1024:.1f} KB vs {per_image_size / 1024:.1f} KB embedded per image "
+              f"({atlas_size / max(per_image_size, 1):.0%})")
+    
+    # Image payloads are embedded once each as inert script blocks outside
+    # itemsData; items refer to them by index and the page decodes them lazily
+    image_blocks = []
+    image_block_ids = {}
+    
+    def add_image_block(encoded):
+        if encoded not in image_block_ids:
+            image_block_ids[encoded] = len(image_blocks)
+            image_blocks.append(encoded)
+        return image_block_ids[encoded]
     
-    # Convert images to base64 and embed in items data
+    image_mode = f"{THUMBNAIL_SIZE}px-q{THUMBNAIL_QUALITY}" if thumbnails else 'full'
+    
+    def timed_encode_image(image_path):
+        started = time.perf_counter()
+        encoded = encode_image(image_path, thumbs_dir, thumbnails)
+        metrics.time('encode image', time.perf_counter() - started)
+        metrics.count('images', 'encoded' if encoded else 'missing')
+        return encoded
+    
+    def encoded_image(image_path):
+        if build_cache is None:
+            return timed_encode_image(image_path)
+        digest = build_cache.file_hash(image_path)
+        if digest is None:
+            metrics.count('images', 'missing')
+            return None
+        key = f"{digest}-{image_mode}"
+        encoded = build_cache.load_blob(key)
+        if encoded is None:
+            encoded = timed_encode_image(image_path)
+            if encoded:
+                build_cache.store_blob(key, encoded)
+        else:
+            metrics.count('images', 'cached')
+        return encoded
+    
+    # Reference each item's image from the items data
     items_with_base64 = {}
     for category, items in items_data.items():
         items_with_base64[category] = []
         for item in items:
             item_copy = item.copy()
+            item_copy['category'] = category
             # If item has an image path, load and convert to base64
             if 'image_path' in item_copy:
                 image_full_path = os.path.join(output_dir, item_copy['image_path'])
-                base64_data = load_image_as_base64(image_full_path)
-                if base64_data:
-                    item_copy['image_base64'] = base64_data
+                if atlas:
+                    # Reference the item's tile in a shared sprite sheet
+                    if image_full_path in atlas_tiles:
+                        item_copy['atlas'] = atlas_tiles[image_full_path]
+                else:
+                    encoded = encoded_image(image_full_path)
+                    if encoded:
+                        item_copy['image_mime'] = encoded['mime']
+                        item_copy['image'] = add_image_block(encoded['1x'])
+                        if '2x' in encoded:
+                            item_copy['image_2x'] = add_image_block(encoded['2x'])
                 # Remove the image_path since we're embedding
                 del item_copy['image_path']
             items_with_base64[category].append(item_copy)
     
+    # Sort orders index into the items flattened in category order
+    flat_items = [item for items in items_with_base64.values() for item in items]
+    with metrics.phase('sort orders'):
+        sort_orders_json = json.dumps(build_sort_orders(flat_items), separators=(',', ':'))
+    with metrics.phase('search index'):
+        search_index_json = json.dumps(build_search_index(flat_items), separators=(',', ':'))
+    with metrics.phase('facets'):
+        facets_json = json.dumps(build_facet_bitsets(flat_items), separators=(',', ':'))
+    
+    # The page displays the raw strings; typed values are only needed above
+    for item in flat_items:
+        item.pop('normalized', None)
+    
     # Convert items data to JSON for JavaScript
-    items_json = json.dumps(items_with_base64)
+    with metrics.phase('serialize'):
+        items_json = json.dumps(items_with_base64)
+        page_data_json = ('{"itemsData":' + items_json + ',"sortOrders":' + sort_orders_json +
+                          ',"searchIndex":' + search_index_json + ',"facets":' + facets_json + '}')
+    
+    if compress:
+        # mtime=0 keeps the output identical when the data has not changed
+        with metrics.phase('compress'):
+            compressed = base64.b64encode(gzip.compress(page_data_json.encode('utf-8'), compresslevel=9, mtime=0)).decode('utf-8')
+        metrics.set('compressed_data_bytes', len(compressed))
+        print(f"Compressed data: {len(page_data_json) / 1024:.1f} KB raw, "
+              f"{len(compressed) / 1024:.1f} KB gzipped as base64 "
+              f"({len(compressed) / max(len(page_data_json), 1):.0%})")
+        page_data_block = f'\n    <script type="application/octet-stream" id="page-data">{compressed}</script>'
+        load_page_data_js = """
+        function loadPageData() {
+            const payload = document.getElementById('page-data').textContent;
+            const bytes = Uint8Array.from(atob(payload), c => c.charCodeAt(0));
+            if ('DecompressionStream' in window) {
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                return new Response(stream).json();
+            }
+            return Promise.resolve(JSON.parse(new TextDecoder().decode(gunzip(bytes))));
+        }
+        """ + INFLATE_JS
+    else:
+        page_data_block = ''
+        load_page_data_js = """
+        function loadPageData() {
+            return Promise.resolve(""" + page_data_json + """);
+        }
+"""
+    
+    # Base64 never contains "<", so the payloads cannot end their script blocks
+    image_blocks_html = ''.join(
+        f'\n    <script type="application/octet-stream" id="image-{index}">{encoded}</script>'
+        for index, encoded in enumerate(image_blocks)
+    )
+    
+    # Each sprite sheet is embedded once as a CSS class shared by its tiles
+    atlas_css = ''.join(
+        f"\n        .atlas-{index} {{ background-image: url(data:image/webp;base64,{sheet}); }}"
+        for index, sheet in enumerate(atlas_sheets)
+    )
     
     html = """<!DOCTYPE html>
 <html lang="en">
@@ -75,6 +537,19 @@ def generate_html(items_data, output_dir='output'):
             font-weight: 600;
             color: #2a5298;
         }
+        .controls input[type="search"] {
+            padding: 8px 12px;
+            border: 2px solid #2a5298;
+            border-radius: 5px;
+            font-size: 14px;
+            width: 240px;
+            background: #2a2a2a;
+            color: #ffffff;
+        }
+        .search-count {
+            font-size: 13px;
+            color: #aaaaaa;
+        }
         .controls select {
             padding: 8px 12px;
             border: 2px solid #2a5298;
@@ -182,6 +657,7 @@ def generate_html(items_data, output_dir='output'):
             grid-template-columns: repeat(auto-fill, minmax(132px, 1fr));
             gap: 5px;
             padding: 6px;
+            overflow-anchor: none;
         }
         .item-card {
             background: #1a1a1a;
@@ -208,6 +684,11 @@ def generate_html(items_data, output_dir='output'):
             margin: 0 auto 2px;
             display: block;
         }
+        .atlas-tile {
+            width: 120px;
+            height: 120px;
+            background-repeat: no-repeat;
+        }""" + atlas_css + """
         .no-image {
             width: 120px;
             height: 120px;
@@ -274,6 +755,8 @@ def generate_html(items_data, output_dir='output'):
 
         <div class="controls">
             <div class="controls-row">
+                <input type="search" id="searchBox" placeholder="Search items, locations, ammo..." autocomplete="off" oninput="updateSearch()">
+                <span class="search-count" id="searchCount"></span>
                 <label for="sortBy">Sort by:</label>
                 <select id="sortBy" onchange="renderItems()">
                     <option value="name-asc">Name (A-Z)</option>
@@ -294,372 +777,579 @@ def generate_html(items_data, output_dir='output'):
                     <div style="display: flex; align-items: center; gap: 15px; margin-left: 30px;">
                         <strong style="color: #2a5298;">Show Rarities:</strong>
                         <div class="custom-multiselect" id="rarityMultiselect">
-                            <div class="multiselect-display" onclick="toggleRarityDropdown()">
+                            <div class="multiselect-display" onclick="toggleDropdown('rarityOptions')">
                                 <span id="rarityDisplayText">Select rarities...</span>
                             </div>
                             <div class="multiselect-options" id="rarityOptions">
                             </div>
                         </div>
                     </div>
+                    
+                    <div style="display: flex; align-items: center; gap: 15px; margin-left: 30px;">
+                        <strong style="color: #2a5298;">Found In:</strong>
+                        <div class="custom-multiselect" id="locationMultiselect">
+                            <div class="multiselect-display" onclick="toggleDropdown('locationOptions')">
+                                <span id="locationDisplayText">Select locations...</span>
+                            </div>
+                            <div class="multiselect-options" id="locationOptions">
+                            </div>
+                        </div>
+                    </div>
                 </div>
             </div>
         </div>
         
         <div class="items-grid" id="itemsGrid"></div>
     </div>
+    """ + page_data_block + image_blocks_html + """
     
     <script>
-        const itemsData = """ + items_json + """;
-        let visibleCategories = new Set();
-        let visibleRarities = new Set();
+        // Items by category, the item indices for each sort option, the
+        // search index and the facet bitsets, precomputed by generate_html
+        // and filled in by loadPageData()
+        let itemsData = {};
+        let sortOrders = {};
+        let searchIndex = { tokens: [], postings: [] };
+        let allItems = [];
+""" + load_page_data_js + """
+        // Facet filters: generate_html sends a bitset per value of each facet
+        // (category, rarity, locations), bit i standing for allItems[i], and
+        // one for the items without a value. Selected values are ORed within
+        // a facet and the facets ANDed with each other and the search, so a
+        // filter change is a few passes over allItems.length / 32 words. The
+        // count shown next to each value is the popcount of its bitset ANDed
+        // with every other filter.
+        let wordCount = 0;
+        const facets = {};
+        let visibleBits = new Uint32Array(0);
+        let otherBits = new Uint32Array(0);
+        // Indices of the visible items in the selected sort order
+        let visibleIndices = new Uint32Array(0);
+        let visibleCount = 0;
         
-        function initializeCategoryFilters() {
-            const checkboxContainer = document.getElementById('categoryCheckboxes');
-            const categories = Object.keys(itemsData);
-            
-            // Initialize all categories as visible
-            categories.forEach(cat => visibleCategories.add(cat));
-            
-            categories.forEach(category => {
-                const wrapper = document.createElement('div');
-                wrapper.className = 'category-filter';
-                
-                const checkbox = document.createElement('input');
-                checkbox.type = 'checkbox';
-                checkbox.id = `cat-${category}`;
-                checkbox.checked = true;
-                checkbox.onchange = () => toggleCategory(category);
-                
-                const label = document.createElement('label');
-                label.htmlFor = `cat-${category}`;
-                label.textContent = `${category} (${itemsData[category].length})`;
-                
-                wrapper.appendChild(checkbox);
-                wrapper.appendChild(label);
-                checkboxContainer.appendChild(wrapper);
+        // Facets picked from a dropdown, and the values left out by default
+        const MULTISELECT_FACETS = {
+            rarity: { optionsId: 'rarityOptions', displayId: 'rarityDisplayText', noun: 'rarities', hidden: ['Legendary'] },
+            can_be_found_in: { optionsId: 'locationOptions', displayId: 'locationDisplayText', noun: 'locations', hidden: [] },
+        };
+        
+        function decodeBitset(payload) {
+            // Little-endian 32-bit words, the byte order of every browser's typed arrays
+            const bytes = Uint8Array.from(atob(payload), c => c.charCodeAt(0));
+            return new Uint32Array(bytes.buffer);
+        }
+        
+        function popcount(x) {
+            x -= (x >>> 1) & 0x55555555;
+            x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+            return Math.imul((x + (x >>> 4)) & 0x0F0F0F0F, 0x01010101) >>> 24;
+        }
+        
+        function loadFacets(facetBitsets) {
+            wordCount = Math.ceil(allItems.length / 32);
+            Object.entries(facetBitsets).forEach(([name, facet]) => {
+                const values = new Map(Object.entries(facet.values).map(([value, payload]) => [value, decodeBitset(payload)]));
+                facets[name] = {
+                    values,
+                    missing: decodeBitset(facet.missing),
+                    selected: new Set(values.keys()),
+                    mask: new Uint32Array(wordCount),
+                    checkboxes: new Map(),
+                    labels: new Map(),
+                };
             });
+            visibleBits = new Uint32Array(wordCount);
+            otherBits = new Uint32Array(wordCount);
+            searchBits = new Uint32Array(wordCount);
+            wordBits = new Uint32Array(wordCount);
+            visibleIndices = new Uint32Array(allItems.length);
         }
         
-        function initializeRarityFilters() {
-            const rarityOptions = document.getElementById('rarityOptions');
+        function addFacetCheckbox(container, name, value, className) {
+            const facet = facets[name];
+            const wrapper = document.createElement('div');
+            wrapper.className = className;
             
-            // Get all unique rarities from items
-            const rarities = new Set();
-            Object.values(itemsData).forEach(categoryItems => {
-                categoryItems.forEach(item => {
-                    if (item.Rarity) {
-                        rarities.add(item.Rarity);
-                    }
-                });
-            });
+            const checkbox = document.createElement('input');
+            checkbox.type = 'checkbox';
+            checkbox.id = `${name}-${value}`;
+            checkbox.checked = facet.selected.has(value);
+            checkbox.onchange = () => {
+                if (checkbox.checked) {
+                    facet.selected.add(value);
+                } else {
+                    facet.selected.delete(value);
+                }
+                updateMultiselectDisplay(name);
+                renderItems();
+            };
             
-            const sortedRarities = Array.from(rarities).sort();
+            const label = document.createElement('label');
+            label.htmlFor = checkbox.id;
+            label.style.cursor = 'pointer';
             
-            // Initialize all rarities except Legendary as visible
-            sortedRarities.forEach(rarity => {
-                if (rarity !== 'Legendary') {
-                    visibleRarities.add(rarity);
-                }
+            wrapper.appendChild(checkbox);
+            wrapper.appendChild(label);
+            container.appendChild(wrapper);
+            facet.checkboxes.set(value, checkbox);
+            facet.labels.set(value, label);
+        }
+        
+        function initializeCategoryFilters() {
+            const checkboxContainer = document.getElementById('categoryCheckboxes');
+            facets.category.values.forEach((_, category) => {
+                addFacetCheckbox(checkboxContainer, 'category', category, 'category-filter');
             });
-            
-            // Create options for the custom multiselect
-            sortedRarities.forEach(rarity => {
-                const optionDiv = document.createElement('div');
-                optionDiv.className = 'multiselect-option';
-                
-                const checkbox = document.createElement('input');
-                checkbox.type = 'checkbox';
-                checkbox.id = `rarity-${rarity}`;
-                checkbox.checked = rarity !== 'Legendary';
-                checkbox.onchange = () => {
-                    if (checkbox.checked) {
-                        visibleRarities.add(rarity);
-                    } else {
-                        visibleRarities.delete(rarity);
-                    }
-                    updateRarityDisplay();
-                    renderItems();
-                };
-                
-                const label = document.createElement('label');
-                label.htmlFor = `rarity-${rarity}`;
-                label.textContent = rarity;
-                label.style.cursor = 'pointer';
-                
-                optionDiv.appendChild(checkbox);
-                optionDiv.appendChild(label);
-                rarityOptions.appendChild(optionDiv);
+        }
+        
+        function initializeMultiselectFilters() {
+            Object.entries(MULTISELECT_FACETS).forEach(([name, config]) => {
+                const facet = facets[name];
+                if (!facet) return;
+                config.hidden.forEach(value => facet.selected.delete(value));
+                const options = document.getElementById(config.optionsId);
+                facet.values.forEach((_, value) => {
+                    addFacetCheckbox(options, name, value, 'multiselect-option');
+                });
+                updateMultiselectDisplay(name);
             });
-            
-            updateRarityDisplay();
         }
         
-        function toggleRarityDropdown() {
-            const options = document.getElementById('rarityOptions');
-            options.classList.toggle('open');
+        function toggleDropdown(optionsId) {
+            document.getElementById(optionsId).classList.toggle('open');
         }
         
-        function updateRarityDisplay() {
-            const displayText = document.getElementById('rarityDisplayText');
-            const selectedRarities = Array.from(visibleRarities);
+        function updateMultiselectDisplay(name) {
+            const config = MULTISELECT_FACETS[name];
+            if (!config) return;
+            const displayText = document.getElementById(config.displayId);
+            const selected = Array.from(facets[name].selected);
             
-            if (selectedRarities.length === 0) {
-                displayText.textContent = 'No rarities selected';
-            } else if (selectedRarities.length === 1) {
-                displayText.textContent = selectedRarities[0];
-            } else if (selectedRarities.length <= 3) {
-                displayText.textContent = selectedRarities.join(', ');
+            if (selected.length === 0) {
+                displayText.textContent = `No ${config.noun} selected`;
+            } else if (selected.length === facets[name].values.size) {
+                displayText.textContent = `All ${config.noun}`;
+            } else if (selected.length <= 3) {
+                displayText.textContent = selected.join(', ');
             } else {
-                displayText.textContent = `${selectedRarities.length} rarities selected`;
+                displayText.textContent = `${selected.length} ${config.noun} selected`;
             }
         }
         
-        // Close dropdown when clicking outside
+        // Close dropdowns when clicking outside them
         document.addEventListener('click', function(event) {
-            const multiselect = document.getElementById('rarityMultiselect');
-            if (!multiselect.contains(event.target)) {
-                document.getElementById('rarityOptions').classList.remove('open');
-            }
+            document.querySelectorAll('.custom-multiselect').forEach(multiselect => {
+                if (!multiselect.contains(event.target)) {
+                    multiselect.querySelector('.multiselect-options').classList.remove('open');
+                }
+            });
         });
         
-        function toggleCategory(category) {
-            const checkbox = document.getElementById(`cat-${category}`);
-            if (checkbox.checked) {
-                visibleCategories.add(category);
-            } else {
-                visibleCategories.delete(category);
-            }
+        function setAllFacetValues(name, checked) {
+            const facet = facets[name];
+            facet.values.forEach((_, value) => {
+                if (checked) {
+                    facet.selected.add(value);
+                } else {
+                    facet.selected.delete(value);
+                }
+                facet.checkboxes.get(value).checked = checked;
+            });
+            updateMultiselectDisplay(name);
             renderItems();
         }
         
         function selectAllCategories() {
-            const categories = Object.keys(itemsData);
-            categories.forEach(category => {
-                visibleCategories.add(category);
-                const checkbox = document.getElementById(`cat-${category}`);
-                if (checkbox) checkbox.checked = true;
-            });
-            renderItems();
+            setAllFacetValues('category', true);
         }
         
         function selectNoneCategories() {
-            visibleCategories.clear();
-            const categories = Object.keys(itemsData);
-            categories.forEach(category => {
-                const checkbox = document.getElementById(`cat-${category}`);
-                if (checkbox) checkbox.checked = false;
-            });
-            renderItems();
+            setAllFacetValues('category', false);
         }
         
-        function selectAllRarities() {
-            visibleRarities.clear();
-            
-            const checkboxes = document.querySelectorAll('#rarityOptions input[type="checkbox"]');
-            checkboxes.forEach(checkbox => {
-                checkbox.checked = true;
-                const rarity = checkbox.id.replace('rarity-', '');
-                visibleRarities.add(rarity);
+        function updateFacetMask(facet) {
+            // Items with a selected value, or with no value for the facet
+            const mask = facet.mask;
+            mask.set(facet.missing);
+            facet.selected.forEach(value => {
+                const bits = facet.values.get(value);
+                for (let w = 0; w < wordCount; w++) mask[w] |= bits[w];
             });
-            
-            updateRarityDisplay();
-            renderItems();
         }
         
-        function selectNoneRarities() {
-            visibleRarities.clear();
-            
-            const checkboxes = document.querySelectorAll('#rarityOptions input[type="checkbox"]');
-            checkboxes.forEach(checkbox => {
-                checkbox.checked = false;
+        function updateFilters() {
+            const facetList = Object.values(facets);
+            facetList.forEach(updateFacetMask);
+            if (searchActive) {
+                visibleBits.set(searchBits);
+            } else {
+                visibleBits.fill(0xFFFFFFFF);
+            }
+            facetList.forEach(facet => {
+                // Everything but this facet's own selection narrows its counts
+                otherBits.set(visibleBits);
+                facetList.forEach(other => {
+                    if (other === facet) return;
+                    const mask = other.mask;
+                    for (let w = 0; w < wordCount; w++) otherBits[w] &= mask[w];
+                });
+                facet.labels.forEach((label, value) => {
+                    const bits = facet.values.get(value);
+                    let count = 0;
+                    for (let w = 0; w < wordCount; w++) count += popcount(bits[w] & otherBits[w]);
+                    label.textContent = `${value} (${count})`;
+                });
+            });
+            facetList.forEach(facet => {
+                const mask = facet.mask;
+                for (let w = 0; w < wordCount; w++) visibleBits[w] &= mask[w];
             });
-            
-            updateRarityDisplay();
-            renderItems();
         }
         
-
-        
         function parseNumber(value) {
             if (!value) return 0;
             const str = String(value).replace(/[^0-9.-]/g, '');
             return parseFloat(str) || 0;
         }
         
-        function getAllItems() {
-            const allItems = [];
-            Object.entries(itemsData).forEach(([category, items]) => {
-                if (visibleCategories.has(category)) {
-                    items.forEach(item => {
-                        // Check if item's rarity is visible (or if no rarity, show it)
-                        const itemRarity = item.Rarity || 'Unknown';
-                        if (!item.Rarity || visibleRarities.has(itemRarity)) {
-                            allItems.push({ ...item, category: category });
-                        }
-                    });
+        // Search: searchIndex.tokens holds every indexed word sorted, and
+        // searchIndex.postings the indices of the items containing each one.
+        // The words starting with a typed prefix are a contiguous run found
+        // by binary search; their items are set in a bitset, and the bitsets
+        // of the query's words ANDed into searchBits for updateFilters().
+        let searchBits = new Uint32Array(0);
+        let wordBits = new Uint32Array(0);
+        let searchActive = false;
+        
+        function firstTokenFrom(word) {
+            const tokens = searchIndex.tokens;
+            let low = 0, high = tokens.length;
+            while (low < high) {
+                const middle = (low + high) >>> 1;
+                if (tokens[middle] < word) low = middle + 1; else high = middle;
+            }
+            return low;
+        }
+        
+        function setPrefixMatches(word, bits) {
+            // Set the bits of the items having a word that starts with `word`
+            const tokens = searchIndex.tokens;
+            bits.fill(0);
+            for (let t = firstTokenFrom(word); t < tokens.length && tokens[t].startsWith(word); t++) {
+                for (const index of searchIndex.postings[t]) {
+                    bits[index >>> 5] |= 1 << (index & 31);
                 }
-            });
-            return allItems;
+            }
+        }
+        
+        function updateSearch() {
+            const words = document.getElementById('searchBox').value.toLowerCase().match(/[a-z0-9]+/g);
+            searchActive = words !== null;
+            if (searchActive) {
+                // Each word narrows the items matched by the words before it
+                setPrefixMatches(words[0], searchBits);
+                for (let i = 1; i < words.length; i++) {
+                    setPrefixMatches(words[i], wordBits);
+                    for (let w = 0; w < wordCount; w++) searchBits[w] &= wordBits[w];
+                }
+            }
+            renderItems();
         }
         
         function renderItems() {
-            const sortBy = document.getElementById('sortBy').value;
-            const [field, order] = sortBy.split('-');
+            updateFilters();
+            const order = sortOrders[document.getElementById('sortBy').value];
+            visibleCount = 0;
+            for (let i = 0; i < order.length; i++) {
+                const index = order[i];
+                if (visibleBits[index >>> 5] & (1 << (index & 31))) {
+                    visibleIndices[visibleCount++] = index;
+                }
+            }
+            
+            document.getElementById('searchCount').textContent =
+                searchActive ? `${visibleCount} match${visibleCount === 1 ? '' : 'es'}` : '';
+            rowHeights = [];
+            updateGridWindow();
+        }
+        
+        function fillCard(card, item) {
+            card.href = item.url || '#';
             
-            let items = getAllItems();
+            const name = item.name || 'Unknown Item';
+            const category = item.category || 'Unknown';
             
-            items.sort((a, b) => {
-                let aVal, bVal;
-                
-                if (field === 'name') {
-                    aVal = (a.name || '').toLowerCase();
-                    bVal = (b.name || '').toLowerCase();
-                    return order === 'asc' ? aVal.localeCompare(bVal) : bVal.localeCompare(aVal);
-                } else if (field === 'category') {
-                    aVal = (a.category || '').toLowerCase();
-                    bVal = (b.category || '').toLowerCase();
-                    const result = order === 'asc' ? aVal.localeCompare(bVal) : bVal.localeCompare(aVal);
-                    if (result === 0) {
-                        // Secondary sort by name
-                        return (a.name || '').toLowerCase().localeCompare((b.name || '').toLowerCase());
-                    }
-                    return result;
-                } else if (field === 'sellprice') {
-                    aVal = parseNumber(a['Sell Price'] || a['Sell price'] || a['sell price'] || 0);
-                    bVal = parseNumber(b['Sell Price'] || b['Sell price'] || b['sell price'] || 0);
-                    return order === 'asc' ? aVal - bVal : bVal - aVal;
-                } else if (field === 'stackvalue') {
-                    const aPrice = parseNumber(a['Sell Price'] || a['Sell price'] || a['sell price'] || 0);
-                    const aStack = parseNumber(a['Stack Size'] || a['Stack size'] || a['stack size'] || 1);
-                    const bPrice = parseNumber(b['Sell Price'] || b['Sell price'] || b['sell price'] || 0);
-                    const bStack = parseNumber(b['Stack Size'] || b['Stack size'] || b['stack size'] || 1);
-                    aVal = aPrice * aStack;
-                    bVal = bPrice * bStack;
-                    return order === 'asc' ? aVal - bVal : bVal - aVal;
+            // Get background color for rarity
+            let backgroundColor = 'white';
+            if (item.background_color) {
+                backgroundColor = item.background_color;
+            } else if (item.Rarity) {
+                // Fallback rarity colors
+                const rarityColors = {
+                    'Common': '#f5f5f5',
+                    'Uncommon': '#e8f5e8', 
+                    'Rare': '#e8f0ff',
+                    'Epic': '#f0e8ff',
+                    'Legendary': '#fff0e8',
+                    'Mythic': '#fffae8'
+                };
+                backgroundColor = rarityColors[item.Rarity] || 'white';
+            }
+            
+            // Build image style with gradient if available
+            let imageStyle = `background-color: ${backgroundColor};`;
+            if (item.image_gradient) {
+                // Use the original gradient style from the wiki
+                imageStyle = item.image_gradient;
+            } else {
+                // Create a dramatic gradient effect based on rarity color that transitions to almost black
+                const gradientColor = backgroundColor === 'white' ? '#f5f5f5' : backgroundColor;
+                if (gradientColor === '#f5f5f5') {
+                    // For white/gray, create a light to almost black gradient
+                    imageStyle = `background: linear-gradient(135deg, #ffffff 0%, #666666 50%, #1a1a1a 100%);`;
+                } else {
+                    // For colored rarities, create a bright to almost black gradient
+                    imageStyle = `background: linear-gradient(135deg, ${gradientColor} 0%, ${gradientColor}60 50%, #1a1a1a 100%);`;
                 }
-                
-                return 0;
-            });
+            }
             
-            const grid = document.getElementById('itemsGrid');
-            grid.innerHTML = '';
+            let imageHtml = '';
+            if (item.atlas) {
+                const [sheet, x, y] = item.atlas;
+                imageHtml = `<div class="item-image" style="${imageStyle}" role="img" aria-label="${name}"><div class="atlas-tile atlas-${sheet}" style="background-position: -${x}px -${y}px"></div></div>`;
+            } else if (item.image !== undefined) {
+                // The payload is attached by loadImage() once the card nears the viewport
+                imageHtml = `<img alt="${name}" class="item-image" style="${imageStyle}">`;
+            } else {
+                imageHtml = `<div class="no-image" style="${imageStyle}">No Image</div>`;
+            }
+            
+            // Build details dynamically based on available properties
+            let detailsHtml = '';
+            const displayedProps = new Set();
+            
+            // Get sell price and stack size for calculations
+            const sellPrice = parseNumber(item['Sell Price'] || item['Sell price'] || item['sell price'] || 0);
+            const stackSize = parseNumber(item['Stack Size'] || item['Stack size'] || item['stack size'] || 0);
             
-            items.forEach(item => {
-                const card = document.createElement('a');
+            // Display sell price without commas
+            if (sellPrice > 0) {
+                detailsHtml += `<div><span class="detail-label">Sell Price:</span><span class="detail-value">${sellPrice}</span></div>`;
+                displayedProps.add('sell price');
+            }
+            
+            // Display stack size
+            if (stackSize > 0) {
+                detailsHtml += `<div><span class="detail-label">Stack Size:</span><span class="detail-value">${stackSize}</span></div>`;
+                displayedProps.add('stack size');
+            }
+            
+            // Display stack value (sell price × stack size)
+            if (sellPrice > 0 && stackSize > 0) {
+                const stackValue = sellPrice * stackSize;
+                detailsHtml += `<div><span class="detail-label">Stack Value:</span><span class="detail-value">${stackValue}</span></div>`;
+            }
+            
+            // Display other properties
+            const otherProps = ['Weight', 'weight', 'Damage', 'damage', 'Type', 'type', 'Rarity', 'rarity'];
+            otherProps.forEach(prop => {
+                if (item[prop] && !displayedProps.has(prop.toLowerCase())) {
+                    const label = prop.split(' ').map(w => w.charAt(0).toUpperCase() + w.slice(1).toLowerCase()).join(' ');
+                    detailsHtml += `<div><span class="detail-label">${label}:</span><span class="detail-value">${item[prop]}</span></div>`;
+                    displayedProps.add(prop.toLowerCase());
+                }
+            });
+            
+            card.innerHTML = `
+                ${imageHtml}
+                <div class="item-name">${name}</div>
+                <div class="item-category">${category}</div>
+                ${detailsHtml ? `<div class="item-details">${detailsHtml}</div>` : ''}
+            `;
+        }
+        
+        // The grid is virtualized: only rows in or near the viewport are
+        // attached, and padding on the grid stands in for the rows above and
+        // below. Each item's card is built once, keyed by item URL, and filter,
+        // sort and scroll changes only move existing nodes in and out of the
+        // grid, so images are never re-parsed or re-decoded.
+        const OVERSCAN_ROWS = 3;
+        const GRID_PADDING = 6;
+        let gridColumns = 0;
+        let rowHeights = [];  // Measured height of each row, by row index
+        let averageRowHeight = 260;  // Estimate for rows not measured yet
+        const cardsByKey = new Map();
+        
+        // Image payloads live in inert script blocks outside itemsData and
+        // are only turned into data URLs when a card comes within
+        // IMAGE_MARGIN of the viewport
+        const IMAGE_MARGIN = '400px';
+        const pendingImages = new Map();  // img element -> item
+        
+        function imageDataUrl(item, index) {
+            const payload = document.getElementById(`image-${index}`).textContent;
+            return `data:${item.image_mime || 'image/png'};base64,${payload}`;
+        }
+        
+        function loadImage(img) {
+            const item = pendingImages.get(img);
+            pendingImages.delete(img);
+            imageObserver.unobserve(img);
+            if (item.image_2x !== undefined) {
+                img.srcset = `${imageDataUrl(item, item.image)} 1x, ${imageDataUrl(item, item.image_2x)} 2x`;
+            }
+            img.src = imageDataUrl(item, item.image);
+        }
+        
+        const imageObserver = 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        loadImage(entry.target);
+                    }
+                });
+            }, { rootMargin: IMAGE_MARGIN })
+            : { observe: loadImage, unobserve() {} };
+        
+        function getCard(item) {
+            const key = item.url || item;
+            let card = cardsByKey.get(key);
+            if (!card) {
+                card = document.createElement('a');
                 card.className = 'item-card';
-                card.href = item.url || '#';
                 card.target = '_blank';
                 card.rel = 'noopener noreferrer';
-                
-                const name = item.name || 'Unknown Item';
-                const category = item.category || 'Unknown';
-                
-                // Get background color for rarity
-                let backgroundColor = 'white';
-                if (item.background_color) {
-                    backgroundColor = item.background_color;
-                } else if (item.Rarity) {
-                    // Fallback rarity colors
-                    const rarityColors = {
-                        'Common': '#f5f5f5',
-                        'Uncommon': '#e8f5e8', 
-                        'Rare': '#e8f0ff',
-                        'Epic': '#f0e8ff',
-                        'Legendary': '#fff0e8',
-                        'Mythic': '#fffae8'
-                    };
-                    backgroundColor = rarityColors[item.Rarity] || 'white';
+                fillCard(card, item);
+                if (item.image !== undefined) {
+                    const img = card.querySelector('img');
+                    pendingImages.set(img, item);
+                    imageObserver.observe(img);
                 }
-                
-                // Build image style with gradient if available
-                let imageStyle = `background-color: ${backgroundColor};`;
-                if (item.image_gradient) {
-                    // Use the original gradient style from the wiki
-                    imageStyle = item.image_gradient;
-                } else {
-                    // Create a dramatic gradient effect based on rarity color that transitions to almost black
-                    const gradientColor = backgroundColor === 'white' ? '#f5f5f5' : backgroundColor;
-                    if (gradientColor === '#f5f5f5') {
-                        // For white/gray, create a light to almost black gradient
-                        imageStyle = `background: linear-gradient(135deg, #ffffff 0%, #666666 50%, #1a1a1a 100%);`;
-                    } else {
-                        // For colored rarities, create a bright to almost black gradient
-                        imageStyle = `background: linear-gradient(135deg, ${gradientColor} 0%, ${gradientColor}60 50%, #1a1a1a 100%);`;
-                    }
+                cardsByKey.set(key, card);
+            }
+            return card;
+        }
+        
+        function updateGridWindow() {
+            const grid = document.getElementById('itemsGrid');
+            const style = getComputedStyle(grid);
+            // auto-fill resolves to one track per column that fits
+            const columns = style.gridTemplateColumns.split(' ').filter(Boolean).length || 1;
+            const rowGap = parseFloat(style.rowGap) || 0;
+            if (columns !== gridColumns) {
+                gridColumns = columns;
+                rowHeights = [];
+            }
+            
+            const rowCount = Math.ceil(visibleCount / columns);
+            const rowTops = [0];
+            for (let row = 0; row < rowCount; row++) {
+                rowTops.push(rowTops[row] + (rowHeights[row] || averageRowHeight) + rowGap);
+            }
+            
+            // Rows intersecting the viewport, plus some overscan on each side
+            const viewTop = -grid.getBoundingClientRect().top - GRID_PADDING;
+            const viewBottom = viewTop + window.innerHeight;
+            let firstRow = 0;
+            while (firstRow < rowCount && rowTops[firstRow + 1] <= viewTop) firstRow++;
+            let lastRow = firstRow;
+            while (lastRow < rowCount && rowTops[lastRow] < viewBottom) lastRow++;
+            firstRow = Math.max(0, firstRow - OVERSCAN_ROWS);
+            lastRow = Math.min(rowCount, lastRow + OVERSCAN_ROWS);
+            
+            // Reconcile the grid's children with the wanted cards: detach the
+            // ones leaving the window, then move or insert the rest in order
+            const cards = [];
+            for (let i = firstRow * columns; i < Math.min(visibleCount, lastRow * columns); i++) {
+                cards.push(getCard(allItems[visibleIndices[i]]));
+            }
+            const wanted = new Set(cards);
+            Array.from(grid.children).forEach(card => {
+                if (!wanted.has(card)) {
+                    grid.removeChild(card);
                 }
-                
-                let imageHtml = '';
-                if (item.image_base64) {
-                    imageHtml = `<img src="data:image/png;base64,${item.image_base64}" alt="${name}" class="item-image" style="${imageStyle}">`;
+            });
+            let cursor = grid.firstChild;
+            cards.forEach(card => {
+                if (card === cursor) {
+                    cursor = cursor.nextSibling;
                 } else {
-                    imageHtml = `<div class="no-image" style="${imageStyle}">No Image</div>`;
-                }
-                
-                // Build details dynamically based on available properties
-                let detailsHtml = '';
-                const displayedProps = new Set();
-                
-                // Get sell price and stack size for calculations
-                const sellPrice = parseNumber(item['Sell Price'] || item['Sell price'] || item['sell price'] || 0);
-                const stackSize = parseNumber(item['Stack Size'] || item['Stack size'] || item['stack size'] || 0);
-                
-                // Display sell price without commas
-                if (sellPrice > 0) {
-                    detailsHtml += `<div><span class="detail-label">Sell Price:</span><span class="detail-value">${sellPrice}</span></div>`;
-                    displayedProps.add('sell price');
+                    grid.insertBefore(card, cursor);
                 }
-                
-                // Display stack size
-                if (stackSize > 0) {
-                    detailsHtml += `<div><span class="detail-label">Stack Size:</span><span class="detail-value">${stackSize}</span></div>`;
-                    displayedProps.add('stack size');
+            });
+            
+            grid.style.paddingTop = `${GRID_PADDING + rowTops[firstRow]}px`;
+            grid.style.paddingBottom = `${GRID_PADDING + rowTops[rowCount] - rowTops[lastRow]}px`;
+            
+            // Measure the rendered rows; re-layout if the estimates were off
+            let changed = false;
+            for (let row = firstRow; row < lastRow; row++) {
+                let height = 0;
+                for (let i = (row - firstRow) * columns; i < Math.min(cards.length, (row - firstRow + 1) * columns); i++) {
+                    height = Math.max(height, cards[i].offsetHeight);
                 }
-                
-                // Display stack value (sell price × stack size)
-                if (sellPrice > 0 && stackSize > 0) {
-                    const stackValue = sellPrice * stackSize;
-                    detailsHtml += `<div><span class="detail-label">Stack Value:</span><span class="detail-value">${stackValue}</span></div>`;
+                if (height && height !== rowHeights[row]) {
+                    rowHeights[row] = height;
+                    changed = true;
                 }
-                
-                // Display other properties
-                const otherProps = ['Weight', 'weight', 'Damage', 'damage', 'Type', 'type', 'Rarity', 'rarity'];
-                otherProps.forEach(prop => {
-                    if (item[prop] && !displayedProps.has(prop.toLowerCase())) {
-                        const label = prop.split(' ').map(w => w.charAt(0).toUpperCase() + w.slice(1).toLowerCase()).join(' ');
-                        detailsHtml += `<div><span class="detail-label">${label}:</span><span class="detail-value">${item[prop]}</span></div>`;
-                        displayedProps.add(prop.toLowerCase());
-                    }
-                });
-                
-                card.innerHTML = `
-                    ${imageHtml}
-                    <div class="item-name">${name}</div>
-                    <div class="item-category">${category}</div>
-                    ${detailsHtml ? `<div class="item-details">${detailsHtml}</div>` : ''}
-                `;
-                
-                grid.appendChild(card);
+            }
+            const measured = rowHeights.filter(height => height);
+            if (measured.length) {
+                averageRowHeight = measured.reduce((sum, height) => sum + height, 0) / measured.length;
+            }
+            if (changed) {
+                scheduleGridWindowUpdate();
+            }
+        }
+        
+        let gridWindowUpdateScheduled = false;
+        function scheduleGridWindowUpdate() {
+            if (gridWindowUpdateScheduled) return;
+            gridWindowUpdateScheduled = true;
+            requestAnimationFrame(() => {
+                gridWindowUpdateScheduled = false;
+                updateGridWindow();
             });
-
         }
         
+        window.addEventListener('scroll', scheduleGridWindowUpdate, { passive: true });
+        window.addEventListener('resize', () => {
+            // Card widths and therefore heights change with the viewport
+            rowHeights = [];
+            scheduleGridWindowUpdate();
+        });
+        
         // Initialize
-        initializeCategoryFilters();
-        initializeRarityFilters();
-        renderItems();
+        loadPageData().then(data => {
+            itemsData = data.itemsData;
+            sortOrders = data.sortOrders;
+            searchIndex = data.searchIndex;
+            allItems = Object.values(itemsData).flat();
+            loadFacets(data.facets);
+            initializeCategoryFilters();
+            initializeMultiselectFilters();
+            renderItems();
+        });
     </script>
 </body>
 </html>"""
     
+    metrics.set('data_bytes', len(page_data_json))
+    metrics.set('search_index_bytes', len(search_index_json))
+    metrics.set('facets_bytes', len(facets_json))
+    metrics.set('image_bytes', sum(len(encoded) for encoded in image_blocks))
+    metrics.set('atlas_bytes', sum(len(sheet) for sheet in atlas_sheets))
     return html
 
-def main():
+def main(atlas=False, thumbnails=True, compress=False):
     # Create output directory if it doesn't exist
     output_dir = 'output'
     os.makedirs(output_dir, exist_ok=True)
     
     json_file = os.path.join(output_dir, 'items_data.json')
     html_file = os.path.join(output_dir, 'items.html')
+    report_file = os.path.join(output_dir, REPORT_FILE)
+    metrics = RunMetrics('generate')
     
     # Load items data
     try:
@@ -669,13 +1359,36 @@ def main():
         print(f"Error: {json_file} not found. Run scrape.py first.")
         return
     
+    # Keep the SQLite catalog in step with the data the page is built from
+    with metrics.phase('catalog'):
+        export_catalog(items_data, os.path.join(output_dir, 'items.db'))
+    
+    # Skip the build entirely when no input changed since the last one
+    build_cache = BuildCache(os.path.join(output_dir, 'build_cache'))
+    image_paths = sorted({
+        os.path.join(output_dir, item['image_path'])
+        for items in items_data.values() for item in items if 'image_path' in item
+    })
+    options = {'atlas': atlas, 'thumbnails': thumbnails, 'compress': compress}
+    metrics.set('options', options)
+    inputs_digest = build_cache.inputs_digest([json_file] + TEMPLATE_FILES + image_paths, options)
+    if build_cache.is_up_to_date(inputs_digest, html_file):
+        print(f"{html_file} is up to date, no inputs changed")
+        metrics.set('up_to_date', True)
+        write_report(report_file, metrics)
+        return
+    
     # Generate HTML with embedded images
     print("Embedding images as base64...")
-    html_content = generate_html(items_data, output_dir)
+    with metrics.phase('generate'):
+        html_content = generate_html(items_data, output_dir, atlas=atlas, thumbnails=thumbnails,
+                                     compress=compress, build_cache=build_cache, metrics=metrics)
     
     # Save to file
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with metrics.phase('write'):
+        with open(html_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        build_cache.save(inputs_digest, html_file)
     
     total_items = sum(len(items) for items in items_data.values())
     file_size_mb = os.path.getsize(html_file) / (1024 * 1024)
@@ -683,9 +1396,27 @@ def main():
     print(f"Total items: {total_items}")
     print(f"Categories: {len(items_data)}")
     print(f"File size: {file_size_mb:.2f} MB")
+    print(f"Build cache: {build_cache.summary()}")
     print(f"Saved to: {html_file}")
     print(f"Open {html_file} in your browser to view the results.")
     print(f"\nNote: All images are embedded as base64 - this is a single self-contained file!")
+    
+    metrics.set('items', total_items)
+    metrics.set('html_bytes', os.path.getsize(html_file))
+    write_report(report_file, metrics)
+    print(f"\n{metrics.summary_table()}")
+    print(f"Run report saved to: {report_file}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Arc Raiders items HTML page")
+    parser.add_argument('--atlas', action='store_true',
+                        help="pack item thumbnails into shared sprite sheets (requires Pillow)")
+    parser.add_argument('--full-size-images', action='store_true',
+                        help="embed the original wiki images instead of 120px/240px thumbnails")
+    parser.add_argument('--compress', action='store_true',
+                        help="embed the item data gzipped and inflate it in the browser")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(atlas=args.atlas, thumbnails=not args.full_size_images, compress=args.compress)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class CachedResponse:
+    """Body of a fetched URL, either fresh from the network or revalidated from disk"""
+
+    def __init__(self, url, content, encoding, from_cache):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        # Same decoding rule requests uses for Response.text
+        return str(self.content, self.encoding or 'utf-8', errors='replace')
+
+
+class HTTPCache:
+    """Persistent on-disk response cache with ETag/Last-Modified revalidation
+
+    Each URL is stored as two files named after the SHA-1 of the URL: the raw
+    body and a small JSON sidecar with the validators. Requests for a cached
+    URL are sent with If-None-Match/If-Modified-Since, and a 304 answer reuses
+    the body from disk.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.bytes_saved = 0
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.body', base + '.json'
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get('url') != url:
+            return None, None
+        return meta, body
+
+    def _store(self, url, meta, body):
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        # Write to temporary files and rename so concurrent workers or an
+        # interrupted run never leave a half-written entry behind
+        for path, mode, data in ((body_path, 'wb', body), (meta_path, 'w', meta)):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            if mode == 'wb':
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    def fetch(self, session, url, **kwargs):
+        """GET url with session, revalidating any cached copy"""
+        meta, body = self._load(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and meta:
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += len(body)
+            return CachedResponse(url, body, meta.get('encoding'), True)
+
+        response.raise_for_status()
+        content = response.content
+        encoding = response.encoding
+        with self._lock:
+            self.misses += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._store(url, {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'encoding': encoding,
+            }, content)
+        return CachedResponse(url, content, encoding, False)
+
+    def summary(self):
+        return f"{self.hits} hits, {self.misses} misses, {self.bytes_saved / 1024:.1f} KB saved"
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+
+class ImageStore:
+    """Content-addressed image store with a manifest keyed by source URL
+
+    Images are saved once under the SHA-256 of their bytes, so the same
+    picture listed under several categories or URLs shares one file.
+    manifest.json maps each image_url to its blob and the ETag/Last-Modified
+    it was served with, so a known URL is revalidated with a conditional
+    request and only downloaded again when the file behind it changed.
+    """
+
+    def __init__(self, images_dir):
+        self.images_dir = images_dir
+        self.manifest_path = os.path.join(images_dir, 'manifest.json')
+        self._lock = threading.Lock()
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.downloaded = 0
+        self.reused = 0
+        self.deduplicated = 0
+
+    def lookup(self, url):
+        """Return the stored filename for url if its blob is on disk"""
+        entry = self.manifest.get(url)
+        if entry and os.path.exists(os.path.join(self.images_dir, entry['file'])):
+            return entry['file']
+        return None
+
+    def validators(self, url):
+        """Return conditional request headers for the stored copy of url"""
+        entry = self.manifest.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def reuse(self, url):
+        """Count a stored blob confirmed unchanged by a 304 answer"""
+        with self._lock:
+            self.reused += 1
+        return self.manifest[url]['file']
+
+    def add(self, url, content, etag=None, last_modified=None):
+        """Store downloaded bytes for url and return the blob filename"""
+        digest = hashlib.sha256(content).hexdigest()
+        extension = os.path.splitext(urlparse(url).path)[1].lower() or '.png'
+        filename = digest + extension
+        path = os.path.join(self.images_dir, filename)
+        with self._lock:
+            self.downloaded += 1
+            if os.path.exists(path):
+                self.deduplicated += 1
+            else:
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            self.manifest[url] = {'file': filename, 'sha256': digest,
+                                  'etag': etag, 'last_modified': last_modified}
+        return filename
+
+    def register(self, url, filename):
+        """Record an existing blob for url without downloading it again"""
+        if not os.path.exists(os.path.join(self.images_dir, filename)):
+            return None
+        with self._lock:
+            self.reused += 1
+            entry = self.manifest.get(url)
+            # Keep the validators when the blob is the one they were served with
+            if not entry or entry['file'] != filename:
+                self.manifest[url] = {'file': filename, 'sha256': filename.split('.', 1)[0]}
+        return filename
+
+    def prune(self, keep_urls):
+        """Forget URLs not in keep_urls and delete blobs nothing refers to"""
+        with self._lock:
+            self.manifest = {url: entry for url, entry in self.manifest.items() if url in keep_urls}
+            referenced = {entry['file'] for entry in self.manifest.values()}
+            for filename in os.listdir(self.images_dir):
+                digest = filename.split('.', 1)[0]
+                if len(digest) == 64 and filename not in referenced:
+                    os.remove(os.path.join(self.images_dir, filename))
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+
+    def summary(self):
+        return f"{self.downloaded} downloaded, {self.reused} reused, {self.deduplicated} deduplicated"
@@ -0,0 +1,120 @@
+import re
+
+# Keys the scraper adds itself rather than reading from the infobox
+NON_PROPERTY_KEYS = {
+    'name', 'url', 'category', 'image_url', 'image_gradient', 'image_path',
+    'background_color', 'revision_id', 'normalized',
+}
+
+NUMBER = r'-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|-?\.\d+'
+
+# Unit suffixes the wiki writes after numbers, and the unit recorded for them;
+# the canonical key stays the same whether or not a page writes the unit
+UNIT_PATTERNS = (
+    (re.compile(rf'^({NUMBER})\s*/\s*s$'), '/s'),
+    (re.compile(rf'^({NUMBER})\s*s$'), 's'),
+    (re.compile(rf'^({NUMBER})\s*m$'), 'm'),
+    (re.compile(rf'^({NUMBER})\s*%$'), '%'),
+    (re.compile(rf'^({NUMBER})\s*x$'), 'x'),
+)
+# Footnote references copied along with a value, e.g. "76 [1]"
+CITATION_PATTERN = re.compile(r'\s*\[\d+\]')
+NUMBER_PATTERN = re.compile(rf'^({NUMBER})$')
+# Damage per projectile and projectile count, e.g. "166 x12"
+MULTI_HIT_PATTERN = re.compile(rf'^({NUMBER})\s*x\s*(\d+)$')
+# Keys whose values are always lists, even of one entry. The wiki separates
+# entries with commas or renders them run together, e.g. "ResidentialOld World"
+LIST_KEYS = {'can_be_found_in', 'shield_compatibility'}
+LIST_SEPARATOR = re.compile(r'\s*,\s*|(?<=[a-z])(?=[A-Z])')
+
+def canonical_key(key):
+    """Map a wiki label such as 'Sell Price' or 'sell price' to 'sell_price'"""
+    return re.sub(r'[^a-z0-9]+', '_', key.lower()).strip('_')
+
+def parse_number(text):
+    """Parse a number written with optional thousands separators, or return None"""
+    match = NUMBER_PATTERN.match(text.strip())
+    if not match:
+        return None
+    number = match.group(1).replace(',', '')
+    return float(number) if '.' in number else int(number)
+
+def normalize_value(key, raw):
+    """Return (canonical_key, typed_value, unit) triples for one raw infobox value"""
+    text = CITATION_PATTERN.sub('', raw).strip()
+    if key in LIST_KEYS:
+        return [(key, [entry for entry in LIST_SEPARATOR.split(text) if entry], None)]
+    # Per-level values: "a,b,c,d" under "... All Levels" labels, or "a | b | c"
+    separator = ',' if key.endswith('_all_levels') else '|'
+    if separator in text:
+        levels = [parse_number(level) for level in text.split(separator)]
+        if None not in levels:
+            return [(key, levels, None)]
+    number = parse_number(text)
+    if number is not None:
+        return [(key, number, None)]
+    for pattern, unit in UNIT_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            return [(key, parse_number(match.group(1)), unit)]
+    match = MULTI_HIT_PATTERN.match(text)
+    if match:
+        return [(key, parse_number(match.group(1)), None), (key + '_count', int(match.group(2)), None)]
+    if text in ('Yes', 'No'):
+        return [(key, text == 'Yes', None)]
+    return [(key, text, None)]
+
+
+class NormalizedItem:
+    """A scraped item with canonical keys and typed values
+
+    values maps canonical keys to numbers, booleans, lists or strings. units
+    maps the keys of values the wiki wrote with a unit to that unit ('m',
+    's', '/s', '%' or 'x'), so "5m" and "5" both end up under radius. raw
+    maps the same keys to the original strings for display. The first
+    spelling of a label the wiki used wins.
+    """
+
+    __slots__ = ('name', 'url', 'category', 'values', 'units', 'raw')
+
+    def __init__(self, name, url, category, values, units, raw):
+        self.name = name
+        self.url = url
+        self.category = category
+        self.values = values
+        self.units = units
+        self.raw = raw
+
+    @classmethod
+    def from_item(cls, item):
+        """Normalize the raw infobox strings of a scraped item dict"""
+        values = {}
+        units = {}
+        raw = {}
+        for label, value in item.items():
+            if label in NON_PROPERTY_KEYS or not isinstance(value, str):
+                continue
+            for key, typed, unit in normalize_value(canonical_key(label), value):
+                if key not in values:
+                    values[key] = typed
+                    raw[key] = value
+                    if unit:
+                        units[key] = unit
+        return cls(item.get('name'), item.get('url'), item.get('category'), values, units, raw)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def to_dict(self):
+        return {'values': dict(self.values), 'units': dict(self.units)}
+
+def normalize_item(item):
+    """Return the typed values and units to store under an item's 'normalized' key"""
+    return NormalizedItem.from_item(item).to_dict()
+
+def item_values(item):
+    """Typed values of an item, normalizing it if it predates the current 'normalized' layout"""
+    normalized = item.get('normalized')
+    if isinstance(normalized, dict) and 'values' in normalized and 'units' in normalized:
+        return normalized['values']
+    return normalize_item(item)['values']
@@ -0,0 +1,138 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Upper bounds in milliseconds of the latency histogram buckets
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+REPORT_FILE = 'run_report.json'
+
+
+class Histogram:
+    """Every sample of one timing, summarized as percentiles and bucket counts"""
+
+    def __init__(self):
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def to_dict(self):
+        total = sum(self.samples)
+        buckets = {f"<={bound}ms": 0 for bound in HISTOGRAM_BOUNDS_MS}
+        buckets[f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] = 0
+        for seconds in self.samples:
+            label = next((f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS if seconds * 1000 <= bound),
+                         f">{HISTOGRAM_BOUNDS_MS[-1]}ms")
+            buckets[label] += 1
+        return {
+            'count': len(self.samples),
+            'total_s': round(total, 4),
+            'mean_ms': round(total / len(self.samples) * 1000, 3),
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(max(self.samples) * 1000, 3),
+            'buckets': {label: count for label, count in buckets.items() if count},
+        }
+
+
+class RunMetrics:
+    """Structured metrics of one scrape or generate run
+
+    phases holds the wall time of each step of the run, timings a histogram
+    per repeated operation (requests, page parses, image encodes), counters
+    tallies such as status codes, and values everything else worth keeping.
+    Safe to record into from several threads.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.timings = {}
+        self.counters = {}
+        self.values = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def time(self, name, seconds):
+        with self._lock:
+            self.timings.setdefault(name, Histogram()).add(seconds)
+
+    def count(self, group, key, amount=1):
+        with self._lock:
+            counter = self.counters.setdefault(group, {})
+            counter[key] = counter.get(key, 0) + amount
+
+    def set(self, name, value):
+        with self._lock:
+            self.values[name] = value
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'elapsed_s': round(time.perf_counter() - self._started, 3),
+                'phases': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+                'timings': {name: histogram.to_dict() for name, histogram in self.timings.items()},
+                'counters': {group: {str(key): count for key, count in counter.items()}
+                             for group, counter in self.counters.items()},
+                'values': dict(self.values),
+            }
+
+    def summary_table(self):
+        """A one-screen text summary of the run"""
+        report = self.to_dict()
+        lines = [f"Run report ({self.name}, {report['elapsed_s']:.2f}s)"]
+        if report['phases']:
+            lines.append('  phases: ' + ', '.join(f"{name} {seconds:.2f}s" for name, seconds in report['phases'].items()))
+        if report['timings']:
+            width = max(len(name) for name in report['timings'])
+            header = f"  {'timing'.ljust(width)}  {'count':>6}  {'total s':>8}  {'mean ms':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}"
+            lines += [header, '  ' + '-' * (len(header) - 2)]
+            for name, timing in report['timings'].items():
+                lines.append(f"  {name.ljust(width)}  {timing['count']:>6}  {timing['total_s']:>8.2f}  "
+                             f"{timing['mean_ms']:>8.1f}  {timing['p50_ms']:>8.1f}  {timing['p95_ms']:>8.1f}  "
+                             f"{timing['max_ms']:>8.1f}")
+        for group, counter in report['counters'].items():
+            lines.append(f"  {group}: " + ', '.join(f"{key} {count:,}" for key, count in counter.items()))
+        for name, value in report['values'].items():
+            if isinstance(value, list):
+                continue
+            if isinstance(value, dict) and value and all(isinstance(entry, dict) for entry in value.values()):
+                lines += [f"  {name} {key}: {_inline(entry)}" for key, entry in value.items()]
+            else:
+                lines.append(f"  {name}: {_inline(value) if isinstance(value, dict) else value}")
+        return '\n'.join(lines)
+
+def _inline(values):
+    return ', '.join(f"{key} {value}" for key, value in values.items() if not isinstance(value, (dict, list)))
+
+def write_report(path, metrics):
+    """Store metrics as their run's section of the JSON report, keeping the other sections"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        report = {}
+    report[metrics.name] = metrics.to_dict()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,191 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Items allowed to wait between two stages before the earlier one blocks
+PIPELINE_QUEUE_SIZE = 16
+
+_DONE = object()
+
+
+class StageStats:
+    """Work done by one pipeline stage and the backlog waiting in front of it"""
+
+    def __init__(self, name, workers, unit):
+        self.name = name
+        self.workers = workers
+        self.unit = unit
+        self._lock = threading.Lock()
+        self.items = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self.items += 1
+            self.busy += seconds
+
+    def sample(self, depth):
+        """Record the depth of the stage's input queue when it takes an item"""
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self.depth_total += depth
+            self.depth_samples += 1
+
+    def summary(self, elapsed):
+        utilization = self.busy / max(elapsed * self.workers, 1e-9)
+        mean_depth = self.depth_total / max(self.depth_samples, 1)
+        return (f"{self.name}: {self.items} items by {self.workers} {self.unit}, "
+                f"{self.items / max(elapsed, 1e-9):.1f}/s, busy {self.busy:.2f}s ({utilization:.0%}), "
+                f"queue max {self.max_depth} mean {mean_depth:.1f}")
+
+    def to_dict(self, elapsed):
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'busy_s': round(self.busy, 3),
+            'utilization': round(self.busy / max(elapsed * self.workers, 1e-9), 3),
+            'max_queue': self.max_depth,
+            'mean_queue': round(self.depth_total / max(self.depth_samples, 1), 2),
+        }
+
+def _timed_call(function, args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def run_pipeline(entries, fetch, parse, finish, workers, parse_workers):
+    """Run entries through fetch -> parse -> finish stages with bounded queues
+
+    fetch(entry) runs on `workers` threads and returns the argument tuple for
+    parse, or None if the entry needs no parsing. parse(*args) must be a
+    module-level function; it runs on a pool of `parse_workers` processes so
+    CPU-bound work is not serialized by the GIL. finish(entry, parsed) runs on
+    `workers` threads, with parsed None for entries fetch did not hand on.
+    Returns finish's results in entry order, skipping failed entries, the
+    StageStats of each stage and the elapsed time.
+    """
+    fetch_stats = StageStats('fetch', workers, 'threads')
+    parse_stats = StageStats('parse', parse_workers, 'processes')
+    finish_stats = StageStats('finish', workers, 'threads')
+
+    pending_entries = queue.Queue()
+    for index, entry in enumerate(entries):
+        pending_entries.put((index, entry))
+    parse_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    finish_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    results = {}
+
+    def fetch_worker():
+        while True:
+            fetch_stats.sample(pending_entries.qsize())
+            try:
+                index, entry = pending_entries.get_nowait()
+            except queue.Empty:
+                return
+            started = time.perf_counter()
+            try:
+                parse_args = fetch(entry)
+            except Exception as e:
+                print(f"Error scraping {entry['name']}: {e}")
+                continue
+            fetch_stats.record(time.perf_counter() - started)
+            if parse_args is None:
+                finish_queue.put((index, entry, None))
+            else:
+                parse_queue.put((index, entry, parse_args))
+
+    def parse_dispatcher(pool):
+        # A bounded number of pages is in the pool at once, enough to keep
+        # every process busy; results are handed on oldest first
+        in_flight = deque()
+        limit = max(PIPELINE_QUEUE_SIZE, 2 * parse_workers)
+
+        def hand_on_oldest():
+            index, entry, future = in_flight.popleft()
+            try:
+                parsed, seconds = future.result()
+            except Exception as e:
+                print(f"Error scraping {entry['name']}: {e}")
+                return
+            parse_stats.record(seconds)
+            finish_queue.put((index, entry, parsed))
+
+        def fail_pending(error):
+            # Nothing more can be parsed, so fetch threads stop taking entries
+            while True:
+                try:
+                    _, entry = pending_entries.get_nowait()
+                except queue.Empty:
+                    return
+                print(f"Error scraping {entry['name']}: {error}")
+
+        while True:
+            parse_stats.sample(parse_queue.qsize())
+            job = parse_queue.get()
+            if job is _DONE:
+                break
+            index, entry, parse_args = job
+            try:
+                future = pool.submit(_timed_call, parse, parse_args)
+            except Exception as e:
+                # A killed worker breaks the pool for good. Keep draining
+                # parse_queue so no fetch thread stays blocked on it.
+                print(f"Error scraping {entry['name']}: {e}")
+                fail_pending(e)
+                continue
+            in_flight.append((index, entry, future))
+            if len(in_flight) >= limit:
+                hand_on_oldest()
+        while in_flight:
+            hand_on_oldest()
+
+    def finish_worker():
+        while True:
+            finish_stats.sample(finish_queue.qsize())
+            job = finish_queue.get()
+            if job is _DONE:
+                return
+            index, entry, parsed = job
+            started = time.perf_counter()
+            try:
+                results[index] = finish(entry, parsed)
+            except Exception as e:
+                print(f"Error scraping {entry['name']}: {e}")
+                continue
+            finish_stats.record(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    # Forked workers start instantly and need no importable __main__. The
+    # pool forks all of them on its first task, so run one before any stage
+    # thread exists and no child inherits a lock held by another thread.
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+        pool.submit(int).result()
+        fetchers = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(workers)]
+        finishers = [threading.Thread(target=finish_worker, daemon=True) for _ in range(workers)]
+        dispatcher = threading.Thread(target=parse_dispatcher, args=(pool,), daemon=True)
+        for thread in fetchers + finishers + [dispatcher]:
+            thread.start()
+        try:
+            for thread in fetchers:
+                thread.join()
+            parse_queue.put(_DONE)
+            dispatcher.join()
+            for _ in finishers:
+                finish_queue.put(_DONE)
+            for thread in finishers:
+                thread.join()
+        except KeyboardInterrupt:
+            # Let the threads run dry instead of starting on new entries
+            while not pending_entries.empty():
+                pending_entries.get_nowait()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    elapsed = time.perf_counter() - started
+    return [results[index] for index in sorted(results)], [fetch_stats, parse_stats, finish_stats], elapsed
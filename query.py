@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Query the cached item catalog from the command line.
+Only uses the standard library so it starts without the scraping dependencies.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+
+OUTPUT_DIR = 'output'
+CATALOG_DB = os.path.join(OUTPUT_DIR, 'items.db')
+JSON_FILE = os.path.join(OUTPUT_DIR, 'items_data.json')
+
+COLUMNS = ('name', 'category', 'rarity', 'sell_price', 'stack_size', 'stack_value', 'weight', 'value_per_weight', 'url')
+TABLE_COLUMNS = COLUMNS[:-1]
+RANKINGS = ('sell_price', 'stack_value', 'value_per_weight')
+WHERE_PATTERN = re.compile(r'^(\w+)\s*(>=|<=|=|>|<)\s*(-?(?:\d+(?:\.\d*)?|\.\d+))$')
+
+def where_clause(text):
+    """Parse a numeric filter such as 'radius>=5' into (key, operator, number)"""
+    match = WHERE_PATTERN.match(text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected KEY OP NUMBER with OP one of >= <= = > <, got {text!r}")
+    key, operator, number = match.groups()
+    return key, operator, float(number)
+
+def open_catalog():
+    """Connect to items.db, (re)building it from items_data.json if it is missing or has an older schema"""
+    from catalog_db import SCHEMA_VERSION, export_catalog
+    if os.path.exists(CATALOG_DB):
+        connection = sqlite3.connect(CATALOG_DB)
+        if connection.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            return connection
+        # Older keys and columns would silently match nothing
+        connection.close()
+        print(f"{CATALOG_DB} was built with an older schema, rebuilding it", file=sys.stderr)
+    if not os.path.exists(JSON_FILE):
+        return None
+    # Keep export_catalog's summary out of the results, which may be JSON or CSV
+    with open(JSON_FILE, 'r', encoding='utf-8') as f, contextlib.redirect_stdout(sys.stderr):
+        export_catalog(json.load(f), CATALOG_DB)
+    return sqlite3.connect(CATALOG_DB)
+
+def query_items(connection, categories=(), rarities=(), where=(), by=None, top=None):
+    """Return matching items as dicts, best first when ranked by a numeric column"""
+    conditions = []
+    params = []
+    if categories:
+        conditions.append(f"category IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    if rarities:
+        conditions.append(f"rarity IN ({', '.join('?' * len(rarities))})")
+        params.extend(rarities)
+    # Every normalized infobox value is in properties, indexed on (key, number)
+    for key, operator, number in where:
+        conditions.append(f"url IN (SELECT url FROM properties WHERE key = ? AND number {operator} ?)")
+        params.extend((key, number))
+    sql = (
+        "SELECT name, category, rarity, sell_price, stack_size, stack_value, weight, "
+        "CASE WHEN weight > 0 THEN sell_price / weight END AS value_per_weight, url FROM items"
+    )
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if by:
+        sql += f" ORDER BY {by} IS NULL, {by} DESC, name"
+    else:
+        sql += " ORDER BY name"
+    if top is not None:
+        sql += " LIMIT ?"
+        params.append(top)
+    return [dict(zip(COLUMNS, row)) for row in connection.execute(sql, params)]
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip('0').rstrip('.')
+    return str(value)
+
+def write_table(items, out):
+    rows = [[format_value(item[column]) for column in TABLE_COLUMNS] for item in items]
+    widths = [max([len(column)] + [len(row[i]) for row in rows]) for i, column in enumerate(TABLE_COLUMNS)]
+    out.write('  '.join(column.ljust(width) for column, width in zip(TABLE_COLUMNS, widths)).rstrip() + '\n')
+    out.write('  '.join('-' * width for width in widths) + '\n')
+    for row in rows:
+        out.write('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip() + '\n')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='query', description="Query the cached Arc Raiders item catalog")
+    parser.add_argument('--category', action='append', default=[],
+                        help="only items in this category (repeatable)")
+    parser.add_argument('--rarity', action='append', default=[],
+                        help="only items of this rarity (repeatable)")
+    parser.add_argument('--where', action='append', default=[], type=where_clause, metavar='FILTER',
+                        help="numeric filter on any normalized property, e.g. 'radius>=5' (repeatable)")
+    parser.add_argument('--by', choices=RANKINGS,
+                        help="rank by this value, highest first (default: sell_price with --top, else by name)")
+    parser.add_argument('--top', type=int, metavar='K',
+                        help="only the K best items")
+    parser.add_argument('--format', choices=('table', 'json', 'csv'), default='table',
+                        help="output format (default: table)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    connection = open_catalog()
+    if connection is None:
+        print("Error: no up-to-date catalog found. Run scrape.py or generate_html.py first.", file=sys.stderr)
+        return 1
+    by = args.by or ('sell_price' if args.top is not None else None)
+    try:
+        items = query_items(connection, args.category, args.rarity, args.where, by, args.top)
+    finally:
+        connection.close()
+
+    if args.format == 'json':
+        json.dump(items, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(items)
+    else:
+        write_table(items, sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
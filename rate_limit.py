@@ -0,0 +1,242 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+# Requests per second each host starts at, and the bounds AIMD keeps it in
+DEFAULT_RATE = 20.0
+MIN_RATE = 1.0
+MAX_RATE = 100.0
+# Requests per second added over roughly one second of successful requests
+RATE_INCREASE = 2.0
+# Factor applied to the rate and concurrency limit when a host pushes back
+DECREASE_FACTOR = 0.5
+# At most one decrease per interval, so one burst of 429s halves the rate once
+DECREASE_INTERVAL = 1.0
+
+# Answers that mean "slow down" and lower the rate, and the transient
+# failures that are retried without doing so
+THROTTLE_STATUSES = (429, 503)
+RETRY_STATUSES = THROTTLE_STATUSES + (502, 504)
+# Errors worth retrying; anything else (a bad URL, a redirect loop) fails at once
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+DEFAULT_MAX_RETRIES = 5
+# Exponential backoff when the host sends no Retry-After
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Longest Retry-After honored before trying again anyway
+MAX_RETRY_AFTER = 120.0
+
+# A latency average this many times the best one seen, and at least
+# SLOW_MARGIN seconds above it, counts as the host slowing down
+SLOW_FACTOR = 3.0
+SLOW_MARGIN = 0.25
+LATENCY_SMOOTHING = 0.2
+
+def retry_after_seconds(value, now=None):
+    """Parse a Retry-After header (seconds or an HTTP date) into a delay, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class HostLimiter:
+    """Token bucket and AIMD concurrency limit for the requests to one host
+
+    The bucket refills at `rate` requests per second, up to `burst` tokens.
+    Successful requests raise the rate and the concurrency limit additively;
+    429/503 answers, connection errors and rising latency cut them
+    multiplicatively. A Retry-After pauses every request to the host.
+    """
+
+    def __init__(self, host, rate, max_concurrency):
+        self.host = host
+        self.rate = rate
+        # A starting rate chosen above MAX_RATE raises the ceiling with it
+        self.max_allowed_rate = max(MAX_RATE, rate)
+        self.burst = max(1.0, float(max_concurrency))
+        self.tokens = self.burst
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._latency = None
+        self._best_latency = None
+        self._cond = threading.Condition()
+        # Run statistics
+        self.requests = 0
+        self.statuses = {}
+        self.retries = 0
+        self.failures = 0
+        self.paused = 0.0
+        self.min_rate = self.max_rate = rate
+        self.min_limit = self.limit
+
+    def acquire(self):
+        """Block until a concurrency slot and a token are available"""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self.paused_until:
+                    self.tokens = 0.0
+                    self._cond.wait(self.paused_until - now)
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    self._cond.wait((1 - self.tokens) / self.rate)
+
+    def release(self, latency, status=None, transient=True):
+        """Record a finished request, status None meaning it raised, and adapt
+
+        A request that raised a non-transient error says nothing about the
+        host, so it is counted without adapting the rate or concurrency.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            key = status if status is not None else 'error'
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            if status is None and not transient:
+                pass
+            elif status in THROTTLE_STATUSES:
+                self._decrease(rate=True)
+            elif status is None or status in RETRY_STATUSES:
+                self._decrease(rate=False)
+            else:
+                self._latency = latency if self._latency is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self._latency)
+                if self._best_latency is None or self._latency < self._best_latency:
+                    self._best_latency = self._latency
+                if self._latency > max(SLOW_FACTOR * self._best_latency, self._best_latency + SLOW_MARGIN):
+                    self._decrease(rate=False)
+                else:
+                    self.rate = min(self.max_allowed_rate, self.rate + RATE_INCREASE / self.rate)
+                    self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                    self.max_rate = max(self.max_rate, self.rate)
+            self._cond.notify_all()
+
+    def _decrease(self, rate):
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        if rate:
+            self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+            self.min_rate = min(self.min_rate, self.rate)
+        self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+        self.min_limit = min(self.min_limit, self.limit)
+
+    def back_off(self, seconds):
+        """Count a retry and hold back every request to the host for `seconds`"""
+        with self._cond:
+            self.retries += 1
+            until = time.monotonic() + seconds
+            if until > self.paused_until:
+                self.paused += until - max(self.paused_until, time.monotonic())
+                self.paused_until = until
+            self._cond.notify_all()
+
+    def give_up(self):
+        with self._cond:
+            self.failures += 1
+
+    def summary(self):
+        statuses = ', '.join(f"{status} x{count}" for status, count in sorted(self.statuses.items(), key=str))
+        return (f"{self.host}: {self.requests} requests ({statuses}), {self.retries} retries, "
+                f"{self.failures} gave up, paused {self.paused:.1f}s; "
+                f"rate {self.rate:.1f}/s (range {self.min_rate:.1f}-{self.max_rate:.1f}), "
+                f"concurrency {int(self.limit)} (min {int(self.min_limit)})")
+
+    def to_dict(self):
+        with self._cond:
+            return {
+                'requests': self.requests,
+                'statuses': {str(status): count for status, count in self.statuses.items()},
+                'retries': self.retries,
+                'failures': self.failures,
+                'paused_s': round(self.paused, 3),
+                'rate': round(self.rate, 2),
+                'min_rate': round(self.min_rate, 2),
+                'max_rate': round(self.max_rate, 2),
+                'concurrency': int(self.limit),
+            }
+
+
+class FetchScheduler:
+    """Routes HTTP requests through a HostLimiter per host, retrying throttled ones
+
+    request() sends through any callable with the signature of
+    requests.Session.request. 429/502/503/504 answers, connection errors and
+    timeouts are retried up to max_retries times, waiting for the host's Retry-After
+    or an exponential backoff; the last answer is returned, or the last
+    error raised, once retries run out.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, max_concurrency=8, max_retries=DEFAULT_MAX_RETRIES):
+        self.rate = rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostLimiter(host, self.rate, self.max_concurrency)
+            return self._hosts[host]
+
+    def request(self, send, method, url, *args, **kwargs):
+        limiter = self.limiter(urlsplit(url).netloc)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = send(method, url, *args, **kwargs)
+            except RETRY_EXCEPTIONS:
+                limiter.release(time.perf_counter() - started)
+                if attempt == self.max_retries:
+                    limiter.give_up()
+                    raise
+                delay = None
+            except Exception:
+                limiter.release(time.perf_counter() - started, transient=False)
+                raise
+            else:
+                limiter.release(time.perf_counter() - started, response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.max_retries:
+                    limiter.give_up()
+                    return response
+                delay = retry_after_seconds(response.headers.get('Retry-After'))
+                response.close()
+            if delay is None:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            limiter.back_off(min(delay, MAX_RETRY_AFTER))
+
+    def summary(self):
+        """One line per host with its request counts and the rates it settled on"""
+        with self._lock:
+            return [limiter.summary() for limiter in self._hosts.values()]
+
+    def to_dict(self):
+        with self._lock:
+            return {host: limiter.to_dict() for host, limiter in self._hosts.items()}
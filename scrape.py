@@ -1,51 +1,302 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import argparse
 import json
 import os
-from urllib.parse import urljoin
-import re
+import threading
+import time
+from urllib.parse import urljoin, unquote, urlsplit, quote
+
+from catalog_db import export_catalog
+from crawl_journal import CrawlJournal
+from pipeline import run_pipeline
+from http_cache import HTTPCache
+from image_store import ImageStore
+from item_model import normalize_item
+from metrics import REPORT_FILE, RunMetrics, write_report
+from rate_limit import DEFAULT_MAX_RETRIES, DEFAULT_RATE, FetchScheduler
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+# Wiki root; override with ARC_WIKI_URL to crawl a local stand-in server
+BASE_URL = os.environ.get('ARC_WIKI_URL', 'https://arcraiders.wiki').rstrip('/')
+API_URL = f'{BASE_URL}/w/api.php'
 
 # All categories to scrape
 CATEGORIES = {
-    'Grenades': 'https://arcraiders.wiki/wiki/Grenades',
-    'Trinkets': 'https://arcraiders.wiki/wiki/Category:Trinket',
-    'Loot': 'https://arcraiders.wiki/wiki/Loot',
-    'Weapons': 'https://arcraiders.wiki/wiki/Weapons',
-    'Augments': 'https://arcraiders.wiki/wiki/Augments',
-    'Shields': 'https://arcraiders.wiki/wiki/Shields',
-    'Healing': 'https://arcraiders.wiki/wiki/Healing',
-    'Quick Use': 'https://arcraiders.wiki/wiki/Quick_Use',
-    'Traps': 'https://arcraiders.wiki/wiki/Traps'
+    'Grenades': f'{BASE_URL}/wiki/Grenades',
+    'Trinkets': f'{BASE_URL}/wiki/Category:Trinket',
+    'Loot': f'{BASE_URL}/wiki/Loot',
+    'Weapons': f'{BASE_URL}/wiki/Weapons',
+    'Augments': f'{BASE_URL}/wiki/Augments',
+    'Shields': f'{BASE_URL}/wiki/Shields',
+    'Healing': f'{BASE_URL}/wiki/Healing',
+    'Quick Use': f'{BASE_URL}/wiki/Quick_Use',
+    'Traps': f'{BASE_URL}/wiki/Traps'
 }
 
+# Maximum number of titles per MediaWiki API query
+API_BATCH_SIZE = 50
+
+# Crawl backends: 'html' scrapes the rendered wiki pages, 'api' lists Category:
+# pages through list=categorymembers and fetches each page's parser output with
+# one action=parse request, which skips the skin but saves no requests
+CRAWL_BACKENDS = ('html', 'api')
+
+# BeautifulSoup tree builders usable for item pages; lxml is used when installed
+PARSER_BACKENDS = ('html.parser', 'lxml')
+DEFAULT_PARSER = 'lxml' if lxml is not None else 'html.parser'
+
+# Everything scrape_item_page reads (data-tag rows, infobox, item image) is
+# inside the article body, so the skin and navigation are never turned into tags
+ITEM_CONTENT_STRAINER = SoupStrainer(id='mw-content-text')
+
+# (item name, seconds) for every item page parsed during a run
+parse_times = []
+
+# Number of item pages fetched concurrently by main()
+DEFAULT_WORKERS = 8
+
+# Conditional-request cache for pages and images; None disables it
+HTTP_CACHE_DIR = os.path.join('output', 'http_cache')
+http_cache = HTTPCache(HTTP_CACHE_DIR)
+
+# Per-host rate limits, Retry-After handling and retries for every request;
+# main() replaces it with one sized for the run
+fetch_scheduler = FetchScheduler()
+
+# Request latencies, status codes, bytes and per-page timings of the current
+# run; main() starts a fresh one and writes it to output/run_report.json
+run_metrics = RunMetrics('scrape')
+
+_thread_local = threading.local()
+_image_stores = {}
+_image_stores_lock = threading.Lock()
+
+
+class ScheduledSession(requests.Session):
+    """Keep-alive session whose requests all go through fetch_scheduler"""
+
+    def request(self, method, url, *args, **kwargs):
+        return fetch_scheduler.request(self._send, method, url, *args, **kwargs)
+
+    def _send(self, method, url, *args, **kwargs):
+        """Send one attempt, recording its latency, status and size in run_metrics"""
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except OSError:
+            run_metrics.count('status', 'error')
+            raise
+        kind = request_kind(url, response)
+        run_metrics.time(f'request {kind}', time.perf_counter() - started)
+        run_metrics.count('status', response.status_code)
+        run_metrics.count('requests', kind)
+        run_metrics.count('bytes', kind, len(response.content))
+        return response
+
+
+def request_kind(url, response):
+    """'api', 'image' or 'page', the groups request metrics are kept in"""
+    if url.startswith(API_URL):
+        return 'api'
+    if response.headers.get('Content-Type', '').startswith('image/'):
+        return 'image'
+    return 'page'
+
+
+def get_session():
+    """Return the keep-alive HTTP session owned by the current thread"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = ScheduledSession()
+        _thread_local.session = session
+    return session
+
+def fetch(url):
+    """GET a URL, revalidating against the on-disk cache when enabled"""
+    if http_cache is not None:
+        return http_cache.fetch(get_session(), url)
+    response = get_session().get(url)
+    response.raise_for_status()
+    return response
+
 def get_page_content(url):
     """Fetch page content"""
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.text
+    return fetch(url).text
+
+def get_image_store(images_dir):
+    """Return the content-addressed image store for a directory"""
+    with _image_stores_lock:
+        if images_dir not in _image_stores:
+            _image_stores[images_dir] = ImageStore(images_dir)
+        return _image_stores[images_dir]
 
-def download_image(img_url, save_path):
-    """Download image and save locally"""
+def download_image(img_url, images_dir):
+    """Download image into the image store, returning its filename"""
+    store = get_image_store(images_dir)
+    # The wiki serves a re-uploaded file under the same URL, so a known URL is
+    # revalidated; a 304 keeps the stored blob and a 200 is stored anew
+    filename = store.lookup(img_url)
+    headers = store.validators(img_url) if filename else {}
     try:
-        response = requests.get(img_url)
+        response = get_session().get(img_url, headers=headers)
+        if response.status_code == 304:
+            if not headers:
+                raise requests.HTTPError("304 Not Modified for an unconditional request", response=response)
+            return store.reuse(img_url)
         response.raise_for_status()
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
-        return True
+        return store.add(img_url, response.content,
+                         response.headers.get('ETag'), response.headers.get('Last-Modified'))
     except Exception as e:
         print(f"Error downloading image {img_url}: {e}")
-        return False
+        return None
 
-def sanitize_filename(name):
-    """Sanitize filename to be safe for filesystem"""
-    return re.sub(r'[<>:"/\\|?*]', '_', name)
+def page_title(url):
+    """Get the wiki page title from an article URL"""
+    return unquote(url.split('/wiki/', 1)[1]).replace('_', ' ')
 
-def scrape_category_page(category_url, category_name):
-    """Scrape a category page to get all item links"""
-    base_url = "https://arcraiders.wiki"
+def article_url(title):
+    """Build an article URL for a page title, encoded the way MediaWiki links are"""
+    return f"{BASE_URL}/wiki/" + quote(title.replace(' ', '_'), safe=";@$!*(),/~:")
+
+def api_get(params):
+    """Call the MediaWiki API and return the decoded JSON response"""
+    response = get_session().get(API_URL, params={**params, 'format': 'json', 'formatversion': '2'})
+    response.raise_for_status()
+    data = response.json()
+    if 'error' in data:
+        raise RuntimeError(f"API error {data['error'].get('code')}: {data['error'].get('info')}")
+    return data
+
+def get_revision_ids(urls):
+    """Look up the latest revision ID of each page via batched API queries"""
+    titles = {}
+    for url in urls:
+        titles.setdefault(page_title(url), url)
     
+    revision_ids = {}
+    names = list(titles)
+    for start in range(0, len(names), API_BATCH_SIZE):
+        query = api_get({
+            'action': 'query',
+            'prop': 'revisions',
+            'rvprop': 'ids',
+            'titles': '|'.join(names[start:start + API_BATCH_SIZE]),
+            'redirects': '1',
+        }).get('query', {})
+        # Map redirect targets and titles the API normalized back to the ones
+        # we asked for; several titles can redirect to the same page
+        normalized = {n['to']: n['from'] for n in query.get('normalized', [])}
+        redirects = {}
+        for r in query.get('redirects', []):
+            redirects.setdefault(r['to'], []).append(r['from'])
+        for page in query.get('pages', []):
+            revisions = page.get('revisions')
+            if page.get('missing') or not revisions:
+                continue
+            for title in redirects.get(page['title'], []) + [page['title']]:
+                title = normalized.get(title, title)
+                if title in titles:
+                    revision_ids[titles[title]] = revisions[0]['revid']
+    return revision_ids
+
+def get_category_members(category_title):
+    """List the article titles in a wiki category, following API continuation"""
+    params = {
+        'action': 'query',
+        'list': 'categorymembers',
+        'cmtitle': category_title,
+        'cmtype': 'page',
+        'cmlimit': 'max',
+    }
+    titles = []
+    while True:
+        data = api_get(params)
+        titles.extend(member['title'] for member in data.get('query', {}).get('categorymembers', []))
+        if 'continue' not in data:
+            return titles
+        params.update(data['continue'])
+
+def get_parsed_page_html(title):
+    """Fetch a page's rendered content through action=parse, one request per page
+
+    The API returns only the parser output, without the skin, so it is wrapped
+    in the same #mw-content-text container the full page uses. action=parse
+    takes a single page, and batched revision queries return wikitext rather
+    than the HTML the extraction code reads, so page content is not batched.
+    """
+    data = api_get({
+        'action': 'parse',
+        'page': title,
+        'prop': 'text',
+        'redirects': '1',
+    })
+    return f'<div id="mw-content-text">{data["parse"]["text"]}</div>'
+
+def get_item_html(item_url, backend='html'):
+    """Fetch an item page's HTML with the chosen crawl backend, one request per page either way"""
+    if backend == 'api':
+        return get_parsed_page_html(page_title(item_url))
+    return get_page_content(item_url)
+
+def normalize_url(url):
+    """Normalize an article URL so different spellings of one page compare equal"""
+    parts = urlsplit(url)
+    path = unquote(parts.path).replace(' ', '_')
+    return f"{parts.netloc.lower()}{path}"
+
+def build_crawl_frontier(listings):
+    """Merge category listings into one list of unique pages to crawl
+
+    listings is a sequence of (category_name, item_links) pairs. Pages are
+    deduplicated by normalized URL and kept in first-listed order; each entry
+    records every category it was listed under, the first one being the
+    default category for scrape_item_page.
+    """
+    frontier = {}
+    for category_name, item_links in listings:
+        for link in item_links:
+            key = normalize_url(link['url'])
+            if key not in frontier:
+                frontier[key] = {'name': link['name'], 'url': link['url'], 'categories': []}
+            if category_name not in frontier[key]['categories']:
+                frontier[key]['categories'].append(category_name)
+    return list(frontier.values())
+
+def load_items_by_url(json_file):
+    """Load previously scraped items keyed by URL"""
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            items_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {item['url']: item for items in items_data.values() for item in items}
+
+def scrape_category_page(category_url, category_name, backend='html'):
+    """Scrape a category page to get all item links"""
     print(f"Fetching {category_name} page...")
-    html = get_page_content(category_url)
+    if backend == 'api' and 'Category:' in category_url:
+        # Category listings come from list=categorymembers, which unlike the
+        # rendered mw-pages div is not truncated at the wiki's page size
+        item_links = [
+            {'name': title, 'url': article_url(title)}
+            for title in get_category_members(page_title(category_url))
+        ]
+    elif backend == 'api':
+        item_links = extract_category_links(get_parsed_page_html(page_title(category_url)), category_url)
+    else:
+        item_links = extract_category_links(get_page_content(category_url), category_url)
+    
+    print(f"Found {len(item_links)} items in {category_name}")
+    return item_links
+
+def extract_category_links(html, category_url):
+    """Extract item links from a category page's HTML"""
+    base_url = BASE_URL
     soup = BeautifulSoup(html, 'html.parser')
     
     item_links = []
@@ -82,14 +333,54 @@ def scrape_category_page(category_url, category_name):
                                 'url': full_url
                             })
     
-    print(f"Found {len(item_links)} items in {category_name}")
     return item_links
 
-def scrape_item_page(item_url, item_name, category_name, images_dir):
+def class_matches(tag, predicate):
+    """Evaluate a class predicate the same way BeautifulSoup's class_ filter does"""
+    classes = tag.get('class') or []
+    if any(predicate(cls) for cls in classes):
+        return True
+    return len(classes) > 1 and bool(predicate(' '.join(classes)))
+
+def is_data_tag_class(x):
+    return x and 'data-tag' in x and 'icon' not in x
+
+def is_rarity_class(x):
+    return x and 'data-tag' in x and any(cls.startswith('data-tag-') and cls != 'data-tag' for cls in x.split())
+
+def with_image_path(item_data, image_path):
+    """Copy item_data with image_path placed right after the image fields"""
+    result = {}
+    anchor = 'image_gradient' if 'image_gradient' in item_data else 'image_url'
+    for key, value in item_data.items():
+        result[key] = value
+        if key == anchor:
+            result['image_path'] = image_path
+    return result
+
+def scrape_item_page(item_url, item_name, category_name, images_dir, parser=None, backend='html'):
     """Scrape individual item page"""
     print(f"Scraping {item_name}...")
-    html = get_page_content(item_url)
-    soup = BeautifulSoup(html, 'html.parser')
+    html = get_item_html(item_url, backend)
+    item_data = extract_item_data(html, item_url, item_name, category_name, parser)
+    
+    # Save image locally
+    if 'image_url' in item_data:
+        img_filename = download_image(item_data['image_url'], images_dir)
+        if img_filename:
+            item_data = with_image_path(item_data, f"images/{img_filename}")
+    
+    return item_data
+
+def parse_item_page(html, item_url, item_name, category_name, parser=None):
+    """Extract item data in a parse worker process, returning it with its parse time"""
+    item_data = extract_item_data(html, item_url, item_name, category_name, parser)
+    return item_data, parse_times[-1]
+
+def extract_item_data(html, item_url, item_name, category_name, parser=None):
+    """Extract item data from an item page's HTML"""
+    started = time.perf_counter()
+    soup = BeautifulSoup(html, parser or DEFAULT_PARSER, parse_only=ITEM_CONTENT_STRAINER)
     
     item_data = {}
     item_data['name'] = item_name
@@ -98,8 +389,12 @@ def scrape_item_page(item_url, item_name, category_name, images_dir):
     # Determine actual category from data-tag row content
     actual_category = category_name  # Default to scraped category
     
+    # One scan collects every data-tag row; the category and rarity rows are
+    # then picked out of it with the same class rules as separate find_all calls
+    candidate_rows = soup.find_all('tr', class_=lambda x: x and 'data-tag' in x)
+    
     # Find all data-tag rows without 'icon' and get the one with meaningful content
-    data_tag_rows = soup.find_all('tr', class_=lambda x: x and 'data-tag' in x and 'icon' not in x)
+    data_tag_rows = [row for row in candidate_rows if class_matches(row, is_data_tag_class)]
     data_tag_row = None
     for row in data_tag_rows:
         td = row.find('td')
@@ -139,7 +434,7 @@ def scrape_item_page(item_url, item_name, category_name, images_dir):
     item_data['category'] = actual_category
     
     # Extract rarity and background color from data-tag class
-    rarity_row = soup.find('tr', class_=lambda x: x and 'data-tag' in x and any(cls.startswith('data-tag-') and cls != 'data-tag' for cls in x.split()))
+    rarity_row = next((row for row in candidate_rows if class_matches(row, is_rarity_class)), None)
     if rarity_row:
         classes = rarity_row.get('class', [])
         for cls in classes:
@@ -172,7 +467,7 @@ def scrape_item_page(item_url, item_name, category_name, images_dir):
     if content:
         img = content.find('img')
         if img:
-            img_url = urljoin("https://arcraiders.wiki", img.get('src'))
+            img_url = urljoin(BASE_URL, img.get('src'))
             item_data['image_url'] = img_url
             
             # Check if the image has a gradient style applied
@@ -182,12 +477,6 @@ def scrape_item_page(item_url, item_name, category_name, images_dir):
                 if 'background' in parent_style or 'gradient' in parent_style:
                     item_data['image_gradient'] = parent_style
                     print(f"  → Found gradient style for {item_name}: {parent_style}")
-            
-            # Save image locally
-            img_filename = f"{sanitize_filename(category_name)}_{sanitize_filename(item_name)}.png"
-            img_path = os.path.join(images_dir, img_filename)
-            if download_image(img_url, img_path):
-                item_data['image_path'] = f"images/{img_filename}"
     
     # Get infobox data
     infobox = soup.find('table', {'class': 'infobox'})
@@ -228,70 +517,223 @@ def scrape_item_page(item_url, item_name, category_name, images_dir):
                 
                 item_data[key] = value
     
+    parse_times.append((item_name, time.perf_counter() - started))
     return item_data
 
-def main():
+def parse_time_summary():
+    if not parse_times:
+        return "no item pages parsed"
+    total = sum(seconds for _, seconds in parse_times)
+    slowest_name, slowest = max(parse_times, key=lambda entry: entry[1])
+    return (f"{len(parse_times)} pages in {total:.2f}s "
+            f"(mean {total / len(parse_times) * 1000:.1f} ms, slowest {slowest_name} {slowest * 1000:.1f} ms)")
+
+def record_run_metrics(total_items, frontier_size, parser, backend, workers, parse_workers,
+                       stage_stats, elapsed, image_store):
+    """Copy the run's counters from the pipeline, stores and scheduler into run_metrics"""
+    for _, seconds in parse_times:
+        run_metrics.time('parse page', seconds)
+    run_metrics.set('items', total_items)
+    run_metrics.set('frontier', frontier_size)
+    run_metrics.set('options', {'parser': parser, 'backend': backend, 'workers': workers,
+                                'parse_workers': parse_workers})
+    run_metrics.set('images', {'downloaded': image_store.downloaded, 'reused': image_store.reused,
+                               'deduplicated': image_store.deduplicated})
+    run_metrics.set('slowest_pages', [
+        {'name': name, 'ms': round(seconds * 1000, 3)}
+        for name, seconds in sorted(parse_times, key=lambda entry: entry[1], reverse=True)[:5]
+    ])
+    run_metrics.set('stages', {stats.name: stats.to_dict(elapsed) for stats in stage_stats})
+    if http_cache is not None:
+        run_metrics.set('http_cache', {'hits': http_cache.hits, 'misses': http_cache.misses,
+                                       'bytes_saved': http_cache.bytes_saved})
+    run_metrics.set('hosts', fetch_scheduler.to_dict())
+
+def main(workers=DEFAULT_WORKERS, use_cache=True, incremental=False, parser=None, backend='html', resume=False,
+         parse_workers=None, rate=DEFAULT_RATE, max_retries=DEFAULT_MAX_RETRIES):
+    """Scrape every category into output/, returning the items by category"""
+    global http_cache
+    # --no-cache applies to this run only; later runs in the same process
+    # get the module's cache back
+    previous_cache = http_cache
+    if not use_cache:
+        http_cache = None
+    elif http_cache is not None:
+        http_cache.reset_stats()
+    try:
+        return run_scrape(workers, incremental, parser, backend, resume, parse_workers, rate, max_retries)
+    finally:
+        http_cache = previous_cache
+
+def run_scrape(workers, incremental, parser, backend, resume, parse_workers, rate, max_retries):
+    global fetch_scheduler, run_metrics
     print("=== Arc Raiders Item Scraper ===\n")
     
+    parser = parser or DEFAULT_PARSER
+    parse_times.clear()
+    run_metrics = RunMetrics('scrape')
+    # No host gets more requests in flight than there are fetch workers
+    fetch_scheduler = FetchScheduler(rate, max(1, workers), max_retries)
+    print(f"Rate limit: {rate:g} requests/s per host to start, adapting; up to {max_retries} retries")
+    
     # Create output directories
     output_dir = 'output'
     images_dir = os.path.join(output_dir, 'images')
     os.makedirs(output_dir, exist_ok=True)
     os.makedirs(images_dir, exist_ok=True)
+    with _image_stores_lock:
+        _image_stores[images_dir] = ImageStore(images_dir)
     
     json_file = os.path.join(output_dir, 'items_data.json')
     all_items_data = {}
     
+    # Every finished item is journaled right away, so an interrupted run can
+    # be resumed without redoing it
+    try:
+        journal = CrawlJournal(os.path.join(output_dir, 'crawl_journal.jsonl'), resume=resume)
+    except FileExistsError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    if resume:
+        print(f"Resuming: {journal.resumed} items already in the crawl journal")
+    
+    # Previous results, reused for pages whose revision has not changed
+    previous_items = load_items_by_url(json_file) if incremental else {}
+    if incremental and not previous_items:
+        print(f"No previous data in {json_file}, running a full scrape")
+    
     # Initialize all categories
     for category_name in CATEGORIES.keys():
         all_items_data[category_name] = []
     
-    # Scrape all categories
-    temp_items = []  # Store all items temporarily
+    # Get all items in each category
+    listings = []
+    with run_metrics.phase('categories'):
+        for category_name, category_url in CATEGORIES.items():
+            print(f"\n{'='*50}")
+            print(f"Processing category: {category_name}")
+            print(f"{'='*50}")
+            
+            try:
+                listings.append((category_name, scrape_category_page(category_url, category_name, backend)))
+            except Exception as e:
+                print(f"Error processing category {category_name}: {e}")
+    
+    # Collect links from every category first so each page is fetched once
+    frontier = build_crawl_frontier(listings)
+    total_listings = sum(len(items) for _, items in listings)
+    print(f"\nCrawl frontier: {len(frontier)} unique items from {total_listings} listings")
+    
+    # Latest revision of every listed page, stored with each item so later
+    # incremental runs can tell which pages changed
+    listed_urls = [entry['url'] for entry in frontier]
+    try:
+        with run_metrics.phase('revisions'):
+            revision_ids = get_revision_ids(listed_urls)
+    except Exception as e:
+        print(f"Error fetching revision IDs: {e}")
+        revision_ids = {}
+    
+    def is_unchanged(url):
+        revision_id = revision_ids.get(url)
+        return revision_id is not None and previous_items.get(url, {}).get('revision_id') == revision_id
     
-    for category_name, category_url in CATEGORIES.items():
-        print(f"\n{'='*50}")
-        print(f"Processing category: {category_name}")
-        print(f"{'='*50}")
+    
+    def fetch_frontier_entry(entry):
+        if journal.get(entry['url']) is not None or is_unchanged(entry['url']):
+            return None
+        print(f"Scraping {entry['name']}...")
+        html = get_item_html(entry['url'], backend)
+        return html, entry['url'], entry['name'], entry['categories'][0], parser
+    
+    def finish_frontier_entry(entry, parsed):
+        journaled = journal.get(entry['url'])
+        if journaled is not None:
+            # The interrupted run saved the image but not the image manifest
+            if 'image_path' in journaled:
+                store = get_image_store(images_dir)
+                if not store.register(journaled['image_url'], os.path.basename(journaled['image_path'])):
+                    img_filename = download_image(journaled['image_url'], images_dir)
+                    if img_filename:
+                        journaled = dict(journaled, image_path=f"images/{img_filename}")
+            return journaled
         
-        try:
-            # Get all items in category
-            items = scrape_category_page(category_url, category_name)
-            
-            # Scrape each item page
-            for item in items:
-                try:
-                    data = scrape_item_page(item['url'], item['name'], category_name, images_dir)
-                    temp_items.append(data)
-                except Exception as e:
-                    print(f"Error scraping {item['name']}: {e}")
-            
-            print(f"Successfully processed {len(items)} items from {category_name}")
-            
-        except Exception as e:
-            print(f"Error processing category {category_name}: {e}")
+        if parsed is None:
+            # Unchanged since the previous run
+            data = previous_items[entry['url']]
+            if 'image_url' in data:
+                img_filename = download_image(data['image_url'], images_dir)
+                if img_filename:
+                    data = dict(data, image_path=f"images/{img_filename}")
+        else:
+            data, parse_time = parsed
+            parse_times.append(parse_time)
+            if 'image_url' in data:
+                img_filename = download_image(data['image_url'], images_dir)
+                if img_filename:
+                    data = with_image_path(data, f"images/{img_filename}")
+            revision_id = revision_ids.get(entry['url'])
+            if revision_id is not None:
+                data['revision_id'] = revision_id
+        # Canonical keys and typed values next to the raw infobox strings
+        data['normalized'] = normalize_item(data)
+        journal.append(data)
+        return data
+    
+    # Item pages go through a pipeline: fetched on `workers` threads, each
+    # reusing its own keep-alive session, parsed on a pool of processes, then
+    # finished (image download, journal) on threads again. Results come back
+    # in frontier order so the output matches a serial run.
+    workers = max(1, workers)
+    parse_workers = max(1, parse_workers or os.cpu_count() or 1)
+    print(f"Using {workers} fetch worker(s) and {parse_workers} parse process(es)")
+    try:
+        with run_metrics.phase('items'):
+            temp_items, stage_stats, elapsed = run_pipeline(
+                frontier, fetch_frontier_entry, parse_item_page, finish_frontier_entry, workers, parse_workers)
+    except KeyboardInterrupt:
+        journal.close()
+        print("\nInterrupted; run again with --resume to continue from the crawl journal")
+        raise
+    
+    print(f"Successfully processed {len(temp_items)} of {len(frontier)} items in {elapsed:.1f}s")
+    for stats in stage_stats:
+        print(f"  {stats.summary(elapsed)}")
+    
+    if incremental and previous_items:
+        listed = set(listed_urls)
+        changed = sum(1 for url in listed if not is_unchanged(url))
+        removed = [item['name'] for url, item in previous_items.items() if url not in listed]
+        print(f"\nIncremental update: {changed} new or changed, {len(removed)} removed")
+        for name in removed:
+            print(f"  → Removed: {name}")
     
-    # Deduplicate items by URL and group by their actual categories
-    seen_urls = set()
+    # Group items by their actual categories
     for item in temp_items:
-        item_url = item['url']
-        if item_url not in seen_urls:
-            seen_urls.add(item_url)
-            actual_category = item['category']
-            if actual_category in all_items_data:
-                all_items_data[actual_category].append(item)
-            else:
-                # If category doesn't exist, create it
-                all_items_data[actual_category] = [item]
+        actual_category = item['category']
+        if actual_category in all_items_data:
+            all_items_data[actual_category].append(item)
         else:
-            print(f"  → Skipping duplicate: {item['name']} (already processed)")
+            # If category doesn't exist, create it
+            all_items_data[actual_category] = [item]
     
     # Remove empty categories
     all_items_data = {k: v for k, v in all_items_data.items() if v}
     
+    # Drop images no longer used by any item and record the rest
+    image_store = get_image_store(images_dir)
+    image_store.prune({item['image_url'] for items in all_items_data.values() for item in items if 'image_url' in item})
+    image_store.save()
+    
     # Save data to JSON
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(all_items_data, f, indent=2, ensure_ascii=False)
+    with run_metrics.phase('save'):
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(all_items_data, f, indent=2, ensure_ascii=False)
+        # Everything in the journal is now in the JSON
+        journal.finish()
+        
+        # Indexed copy of the catalog for ad-hoc queries
+        export_catalog(all_items_data, os.path.join(output_dir, 'items.db'))
     
     total_items = sum(len(items) for items in all_items_data.values())
     print(f"\n{'='*50}")
@@ -299,10 +741,48 @@ def main():
     print(f"Total items scraped: {total_items}")
     print(f"Categories: {len(all_items_data)}")
     print(f"Data saved to: {json_file}")
-    print(f"Images saved to: {images_dir}")
+    print(f"Images saved to: {images_dir} ({image_store.summary()})")
+    print(f"Parse time ({parser}): {parse_time_summary()}")
+    if http_cache is not None:
+        print(f"HTTP cache: {http_cache.summary()}")
+    for line in fetch_scheduler.summary():
+        print(f"Rate limit: {line}")
     print(f"{'='*50}")
     
+    record_run_metrics(total_items, len(frontier), parser, backend, workers, parse_workers,
+                       stage_stats, elapsed, image_store)
+    report_file = os.path.join(output_dir, REPORT_FILE)
+    write_report(report_file, run_metrics)
+    print(f"\n{run_metrics.summary_table()}")
+    print(f"Run report saved to: {report_file}")
+    
     return all_items_data
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Arc Raiders item data from the wiki")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"number of item pages fetched concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"bypass the conditional-request cache in {HTTP_CACHE_DIR}")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only re-scrape pages whose wiki revision changed since the last run")
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help=f"HTML parser backend for item pages (default: {DEFAULT_PARSER})")
+    parser.add_argument('--backend', choices=CRAWL_BACKENDS, default='html',
+                        help="crawl rendered wiki pages ('html') or the MediaWiki API ('api'): complete category "
+                             "listings, but still one action=parse request per item page")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip items already in the crawl journal of an interrupted run")
+    parser.add_argument('--parse-workers', type=int,
+                        help="processes parsing item pages (default: one per CPU core)")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"requests per second per host to start from before adapting (default: {DEFAULT_RATE:g})")
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"retries for throttled or failed requests (default: {DEFAULT_MAX_RETRIES})")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(workers=args.workers, use_cache=not args.no_cache, incremental=args.incremental, parser=args.parser,
+         backend=args.backend, resume=args.resume, parse_workers=args.parse_workers, rate=args.rate,
+         max_retries=args.max_retries)
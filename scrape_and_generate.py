@@ -2,34 +2,79 @@
 """
 Combined script that scrapes Arc Raiders wiki data and generates HTML.
 This script imports and uses functions from scrape.py and generate_html.py.
+
+`scrape_and_generate.py query ...` runs query.py instead; scrape.py and
+generate_html.py are imported lazily so queries start without requests,
+bs4 or Pillow.
 """
 
-import sys
+import argparse
 import os
+import sys
 
-# Import scraping functionality
-from scrape import main as scrape_main
 
-# Import HTML generation functionality
-from generate_html import main as generate_html_main
+def parse_args(argv=None):
+    from scrape import DEFAULT_WORKERS, DEFAULT_RATE, HTTP_CACHE_DIR, CRAWL_BACKENDS
+    
+    parser = argparse.ArgumentParser(description="Scrape Arc Raiders wiki data and generate HTML")
+    parser.add_argument('--scrape', action='store_true',
+                        help="force fresh data from the web instead of using cached JSON")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"number of item pages fetched concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"requests per second per host to start from before adapting (default: {DEFAULT_RATE:g})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"bypass the conditional-request cache in {HTTP_CACHE_DIR}")
+    parser.add_argument('--incremental', action='store_true',
+                        help="scrape, but only re-fetch pages whose wiki revision changed since the last run")
+    parser.add_argument('--resume', action='store_true',
+                        help="scrape, skipping items already in the crawl journal of an interrupted run")
+    parser.add_argument('--backend', choices=CRAWL_BACKENDS, default='html',
+                        help="crawl rendered wiki pages ('html') or the MediaWiki API ('api'): complete category "
+                             "listings, but still one action=parse request per item page")
+    parser.add_argument('--atlas', action='store_true',
+                        help="pack item thumbnails into shared sprite sheets (requires Pillow)")
+    parser.add_argument('--full-size-images', action='store_true',
+                        help="embed the original wiki images instead of 120px/240px thumbnails")
+    parser.add_argument('--compress', action='store_true',
+                        help="embed the item data gzipped and inflate it in the browser")
+    return parser.parse_args(argv)
 
 
 def main():
+    if sys.argv[1:2] == ['query']:
+        from query import main as query_main
+        return query_main(sys.argv[2:])
+    
+    # Import scraping and HTML generation functionality
+    from scrape import main as scrape_main
+    from generate_html import main as generate_html_main
+    
     print("=== Arc Raiders Item Scraper & HTML Generator ===\n")
     
+    args = parse_args()
+    
     # Check if --scrape flag is passed
-    should_scrape = '--scrape' in sys.argv
+    should_scrape = args.scrape
     
     output_dir = 'output'
     json_file = os.path.join(output_dir, 'items_data.json')
     
     # Check if we need to scrape
-    if should_scrape:
+    if args.resume:
+        print("--resume flag detected, continuing the interrupted scrape...\n")
+        scrape_main(workers=args.workers, use_cache=not args.no_cache, rate=args.rate,
+                    incremental=args.incremental, backend=args.backend, resume=True)
+    elif args.incremental:
+        print("--incremental flag detected, fetching changed pages from web...\n")
+        scrape_main(workers=args.workers, use_cache=not args.no_cache, rate=args.rate, incremental=True,
+                    backend=args.backend)
+    elif should_scrape:
         print("--scrape flag detected, fetching fresh data from web...\n")
-        scrape_main()
+        scrape_main(workers=args.workers, use_cache=not args.no_cache, rate=args.rate, backend=args.backend)
     elif not os.path.exists(json_file):
         print(f"No cached data found at {json_file}, scraping from web...\n")
-        scrape_main()
+        scrape_main(workers=args.workers, use_cache=not args.no_cache, rate=args.rate, backend=args.backend)
     else:
         print(f"Using cached data from {json_file}")
         print("Tip: Use 'python scrape_and_generate.py --scrape' to force fresh data from web\n")
@@ -38,7 +83,7 @@ def main():
     print("\n" + "="*50)
     print("Generating HTML...")
     print("="*50 + "\n")
-    generate_html_main()
+    generate_html_main(atlas=args.atlas, thumbnails=not args.full_size_images, compress=args.compress)
     
     print("\n" + "="*50)
     print("Complete!")
@@ -46,4 +91,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from crawl_journal import CrawlJournal
+
+
+class CrawlJournalTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        self.path = os.path.join(work_dir, 'crawl_journal.jsonl')
+
+    def interrupted_run(self):
+        journal = CrawlJournal(self.path)
+        journal.append({'url': 'https://wiki.test/wiki/A', 'name': 'A'})
+        journal.append({'url': 'https://wiki.test/wiki/B', 'name': 'B'})
+        journal.close()
+        # A crash mid-write leaves a torn last line
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"url": "https://wiki.te')
+
+    def test_resume_loads_intact_entries(self):
+        self.interrupted_run()
+        journal = CrawlJournal(self.path, resume=True)
+        self.addCleanup(journal.close)
+        self.assertEqual(journal.resumed, 2)
+        self.assertEqual(journal.get('https://wiki.test/wiki/B')['name'], 'B')
+
+    def test_fresh_run_refuses_to_overwrite_interrupted_journal(self):
+        self.interrupted_run()
+        with open(self.path, 'rb') as f:
+            before = f.read()
+        with self.assertRaisesRegex(FileExistsError, '--resume'):
+            CrawlJournal(self.path)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+    def test_fresh_run_replaces_empty_journal(self):
+        open(self.path, 'w').close()
+        journal = CrawlJournal(self.path)
+        journal.finish()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import base64
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from generate_html import build_facet_bitsets, build_search_index, encode_bitset
+
+
+def item(name, category, **infobox):
+    return {'name': name, 'url': f'https://arcraiders.wiki/wiki/{name}', 'category': category, **infobox}
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.items = [
+            item('Kettle', 'Weapons', Rarity='Common', Ammo='Light Ammo', Damage='10'),
+            item('Light Impact Grenade', 'Grenades', Rarity='Common', **{'Sell Price': '270'}),
+            item('Rusted Gear', 'Loot', Rarity='Uncommon', **{'Can Be Found In': 'IndustrialMechanical'}),
+        ]
+        self.index = build_search_index(self.items)
+
+    def postings(self, token):
+        return self.index['postings'][self.index['tokens'].index(token)]
+
+    def test_tokens_are_sorted_words_of_names_categories_and_text_values(self):
+        tokens = self.index['tokens']
+        self.assertEqual(tokens, sorted(tokens))
+        self.assertEqual(self.postings('light'), [0, 1])
+        self.assertEqual(self.postings('common'), [0, 1])
+        self.assertEqual(self.postings('loot'), [2])
+        # Run-together locations are split like the normalized values
+        self.assertEqual(self.postings('industrial'), [2])
+        self.assertEqual(self.postings('mechanical'), [2])
+
+    def test_numbers_are_not_indexed(self):
+        self.assertNotIn('10', self.index['tokens'])
+        self.assertNotIn('270', self.index['tokens'])
+
+    def test_item_listed_once_per_token(self):
+        self.items.append(item('Light Light', 'Loot'))
+        index = build_search_index(self.items)
+        self.assertEqual(index['postings'][index['tokens'].index('light')], [0, 1, 3])
+
+
+def decode_bitset(payload):
+    """Indices of the set bits, read as the page's Uint32Array does"""
+    data = base64.b64decode(payload)
+    words = [int.from_bytes(data[i:i + 4], 'little') for i in range(0, len(data), 4)]
+    return [32 * w + bit for w, word in enumerate(words) for bit in range(32) if word >> bit & 1]
+
+
+class FacetBitsetTest(unittest.TestCase):
+    def test_bitset_is_padded_to_whole_words(self):
+        self.assertEqual(len(base64.b64decode(encode_bitset([0, 31], 32))), 4)
+        self.assertEqual(len(base64.b64decode(encode_bitset([32], 33))), 8)
+        self.assertEqual(decode_bitset(encode_bitset([0, 5, 31, 32, 69], 70)), [0, 5, 31, 32, 69])
+
+    def test_facet_values_and_missing(self):
+        items = [
+            item('Kettle', 'Weapons', Rarity='Common'),
+            item('Rusted Gear', 'Loot', Rarity='Uncommon', **{'Can Be Found In': 'IndustrialMechanical'}),
+            item('Mystery', 'Loot'),
+            item('Rope', 'Loot', Rarity='Common', **{'Can Be Found In': 'Industrial'}),
+        ]
+        facets = build_facet_bitsets(items)
+        self.assertEqual(list(facets['category']['values']), ['Weapons', 'Loot'])
+        self.assertEqual(decode_bitset(facets['category']['values']['Loot']), [1, 2, 3])
+        self.assertEqual(decode_bitset(facets['category']['missing']), [])
+        self.assertEqual(decode_bitset(facets['rarity']['values']['Common']), [0, 3])
+        self.assertEqual(decode_bitset(facets['rarity']['missing']), [2])
+        locations = facets['can_be_found_in']['values']
+        self.assertEqual(list(locations), ['Industrial', 'Mechanical'])
+        self.assertEqual(decode_bitset(locations['Industrial']), [1, 3])
+        self.assertEqual(decode_bitset(facets['can_be_found_in']['missing']), [0, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from item_model import item_values, normalize_item
+
+
+class NormalizeItemTest(unittest.TestCase):
+    def test_list_keys_are_always_lists(self):
+        for raw, expected in (('Light', ['Light']), ('Light, Medium', ['Light', 'Medium']),
+                              ('LightMedium', ['Light', 'Medium'])):
+            values = normalize_item({'Shield Compatibility': raw})['values']
+            self.assertEqual(values['shield_compatibility'], expected)
+        values = normalize_item({'Can Be Found In': 'ResidentialOld World'})['values']
+        self.assertEqual(values['can_be_found_in'], ['Residential', 'Old World'])
+
+    def test_other_keys_are_not_split_on_commas(self):
+        values = normalize_item({'Ammo': 'Light, Heavy', 'Sell Price': '1,000'})['values']
+        self.assertEqual(values, {'ammo': 'Light, Heavy', 'sell_price': 1000})
+
+    def test_units_are_kept(self):
+        normalized = normalize_item({'Radius': '5m', 'Duration': '7.5s', 'Weight': '0.3'})
+        self.assertEqual(normalized['values'], {'radius': 5, 'duration': 7.5, 'weight': 0.3})
+        self.assertEqual(normalized['units'], {'radius': 'm', 'duration': 's'})
+
+    def test_item_values_renormalizes_older_layouts(self):
+        item = {'Shield Compatibility': 'Light', 'normalized': {'shield_compatibility': 'Light'}}
+        self.assertEqual(item_values(item), {'shield_compatibility': ['Light']})
+        item['normalized'] = normalize_item(item)
+        self.assertIs(item_values(item), item['normalized']['values'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from metrics import Histogram, RunMetrics, write_report
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentiles_and_buckets(self):
+        histogram = Histogram()
+        for milliseconds in range(1, 101):
+            histogram.add(milliseconds / 1000)
+        summary = histogram.to_dict()
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['p50_ms'], 51)
+        self.assertAlmostEqual(summary['p95_ms'], 96)
+        self.assertAlmostEqual(summary['max_ms'], 100)
+        self.assertEqual(summary['buckets'], {'<=1ms': 1, '<=2ms': 1, '<=5ms': 3, '<=10ms': 5, '<=25ms': 15,
+                                              '<=50ms': 25, '<=100ms': 50})
+
+
+class WriteReportTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        self.path = os.path.join(work_dir, 'run_report.json')
+
+    def test_sections_are_kept_across_runs(self):
+        scrape = RunMetrics('scrape')
+        scrape.count('status', 200, 3)
+        write_report(self.path, scrape)
+        generate = RunMetrics('generate')
+        generate.time('encode image', 0.01)
+        generate.set('html_bytes', 1234)
+        write_report(self.path, generate)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report['scrape']['counters'], {'status': {'200': 3}})
+        self.assertEqual(report['generate']['timings']['encode image']['count'], 1)
+        self.assertEqual(report['generate']['values'], {'html_bytes': 1234})
+        self.assertIn('encode image', generate.summary_table())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from pipeline import run_pipeline
+
+CRASHING_ENTRY = 5
+
+
+def parse_or_die(number):
+    # Stands in for a parse worker killed by the OOM killer or a segfault
+    if number == CRASHING_ENTRY:
+        os._exit(1)
+    return number * 2
+
+
+class RunPipelineTest(unittest.TestCase):
+    def run_pipeline(self, entries, parse):
+        outcome = {}
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                outcome['result'] = run_pipeline(
+                    entries, lambda entry: (entry['number'],), parse,
+                    lambda entry, parsed: parsed, workers=2, parse_workers=1)
+            outcome['output'] = output.getvalue()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), "run_pipeline did not return")
+        return outcome
+
+    def test_results_in_entry_order(self):
+        entries = [{'name': f'Item {n}', 'number': n} for n in range(40)]
+        outcome = self.run_pipeline(entries, abs)
+        results, stats, _ = outcome['result']
+        self.assertEqual(results, list(range(40)))
+        self.assertEqual([stage.items for stage in stats], [40, 40, 40])
+
+    def test_killed_parse_worker_fails_entries_instead_of_hanging(self):
+        entries = [{'name': f'Item {n}', 'number': n} for n in range(100)]
+        outcome = self.run_pipeline(entries, parse_or_die)
+        results, _, _ = outcome['result']
+        self.assertNotIn(CRASHING_ENTRY * 2, results)
+        self.assertLess(len(results), len(entries))
+        self.assertIn(f"Error scraping Item {CRASHING_ENTRY}:", outcome['output'])
+
+
+if __name__ == '__main__':
+    unittest.main()
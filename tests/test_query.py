@@ -0,0 +1,91 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from catalog_db import SCHEMA_VERSION, export_catalog
+
+# A cold `query` run, interpreter start included, must stay under this
+STARTUP_BUDGET = 1.0
+
+ITEMS_DATA = {
+    'Weapons': [
+        {'name': 'Kettle', 'url': 'https://arcraiders.wiki/wiki/Kettle', 'category': 'Weapons',
+         'Rarity': 'Common', 'Sell Price': '840', 'Fire Rate': '28 [1]', 'Magazine Size': '20', 'Weight': '7.0'},
+        {'name': 'Ferro', 'url': 'https://arcraiders.wiki/wiki/Ferro', 'category': 'Weapons',
+         'Rarity': 'Common', 'Sell Price': '475', 'Fire Rate': '6.6', 'Magazine Size': '1', 'Weight': '8.0'},
+    ],
+    'Grenades': [
+        {'name': 'Wasp Driver', 'url': 'https://arcraiders.wiki/wiki/Wasp_Driver', 'category': 'Grenades',
+         'Rarity': 'Rare', 'Sell Price': '1000', 'Stack Size': '3', 'Radius': '5m', 'Weight': '0.6'},
+    ],
+}
+
+
+class QueryCommandTest(unittest.TestCase):
+    """Run the query command the way a user does, against a small catalog"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        output_dir = os.path.join(self.work_dir, 'output')
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, 'items_data.json'), 'w', encoding='utf-8') as f:
+            json.dump(ITEMS_DATA, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_catalog(ITEMS_DATA, os.path.join(output_dir, 'items.db'))
+
+    def run_python(self, *args):
+        return subprocess.run([sys.executable, *args], cwd=self.work_dir, capture_output=True, text=True,
+                              env={**os.environ, 'PYTHONPATH': REPO_DIR}, check=True)
+
+    def test_cold_query_is_fast(self):
+        started = time.perf_counter()
+        result = self.run_python(os.path.join(REPO_DIR, 'scrape_and_generate.py'), 'query', '--top', '5')
+        elapsed = time.perf_counter() - started
+        self.assertIn('Wasp Driver', result.stdout)
+        self.assertLess(elapsed, STARTUP_BUDGET, f"cold query took {elapsed * 1000:.0f} ms")
+
+    def test_query_skips_scraping_dependencies(self):
+        result = self.run_python('-c', (
+            "import sys, query; query.main(['--top', '1']); "
+            "print(','.join(sorted({'requests', 'bs4', 'PIL'} & set(sys.modules))))"
+        ))
+        self.assertEqual(result.stdout.splitlines()[-1], '')
+
+    def test_where_filters_on_normalized_properties(self):
+        result = self.run_python('-m', 'query', '--where', 'fire_rate>20', '--format', 'json')
+        self.assertEqual([item['name'] for item in json.loads(result.stdout)], ['Kettle'])
+
+    def test_where_ignores_units_in_keys(self):
+        result = self.run_python('-m', 'query', '--where', 'radius>=5', '--format', 'json')
+        self.assertEqual([item['name'] for item in json.loads(result.stdout)], ['Wasp Driver'])
+
+    def test_stale_catalog_is_rebuilt(self):
+        # A catalog from before the current schema, with keys it no longer uses
+        db_path = os.path.join(self.work_dir, 'output', 'items.db')
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute("UPDATE properties SET key = 'radius_m' WHERE key = 'radius'")
+            connection.execute('PRAGMA user_version = 1')
+        connection.close()
+        result = self.run_python('-m', 'query', '--where', 'radius>=5', '--format', 'json')
+        self.assertEqual([item['name'] for item in json.loads(result.stdout)], ['Wasp Driver'])
+        self.assertIn('older schema', result.stderr)
+        connection = sqlite3.connect(db_path)
+        self.addCleanup(connection.close)
+        self.assertEqual(connection.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limit
+from rate_limit import FetchScheduler, HostLimiter, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+
+    def close(self):
+        pass
+
+
+def scripted_send(*answers):
+    """A send callable returning (or raising) the given answers in order"""
+    answers = list(answers)
+    calls = []
+
+    def send(method, url, *args, **kwargs):
+        calls.append((method, url))
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+    return send, calls
+
+
+class RetryAfterTest(unittest.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(retry_after_seconds('3'), 3.0)
+
+    def test_http_date(self):
+        now = time.time()
+        self.assertAlmostEqual(retry_after_seconds(formatdate(now + 30, usegmt=True), now=now), 30, delta=1)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(retry_after_seconds(None))
+        self.assertIsNone(retry_after_seconds('soon'))
+
+
+class FetchSchedulerTest(unittest.TestCase):
+
+    def test_retries_throttled_requests_after_retry_after(self):
+        send, calls = scripted_send(FakeResponse(429, '0'), FakeResponse(503, '0'), FakeResponse(200))
+        scheduler = FetchScheduler(rate=50, max_concurrency=2)
+        response = scheduler.request(send, 'GET', 'http://wiki.test/wiki/Page')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 3)
+        limiter = scheduler.limiter('wiki.test')
+        self.assertEqual(limiter.retries, 2)
+        self.assertEqual(limiter.statuses, {429: 1, 503: 1, 200: 1})
+
+    def test_gives_up_after_max_retries(self):
+        send, calls = scripted_send(*[FakeResponse(429, '0')] * 3)
+        scheduler = FetchScheduler(max_retries=2)
+        self.assertEqual(scheduler.request(send, 'GET', 'http://wiki.test/').status_code, 429)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(scheduler.limiter('wiki.test').failures, 1)
+
+    def test_connection_errors_are_retried_then_raised(self):
+        send, calls = scripted_send(requests.ConnectionError('reset'), FakeResponse(200))
+        scheduler = FetchScheduler()
+        with mock.patch.object(rate_limit, 'BACKOFF_BASE', 0.01):
+            self.assertEqual(scheduler.request(send, 'GET', 'http://wiki.test/').status_code, 200)
+            send, calls = scripted_send(*[requests.ConnectionError('reset')] * 2)
+            with self.assertRaises(requests.ConnectionError):
+                FetchScheduler(max_retries=1).request(send, 'GET', 'http://wiki.test/')
+        self.assertEqual(len(calls), 2)
+
+    def test_non_transient_errors_are_raised_at_once(self):
+        for error in (requests.exceptions.InvalidURL('bad'), requests.exceptions.MissingSchema('bad'),
+                      requests.TooManyRedirects('loop')):
+            send, calls = scripted_send(error, FakeResponse(200))
+            scheduler = FetchScheduler(rate=20, max_concurrency=8)
+            with self.assertRaises(type(error)):
+                scheduler.request(send, 'GET', 'http://wiki.test/')
+            self.assertEqual(len(calls), 1)
+            limiter = scheduler.limiter('wiki.test')
+            self.assertEqual(limiter.retries, 0)
+            self.assertEqual((limiter.rate, limiter.limit), (20, 8))
+            self.assertEqual(limiter.in_flight, 0)
+
+
+class HostLimiterTest(unittest.TestCase):
+
+    def test_throttling_halves_rate_and_concurrency_once_per_interval(self):
+        limiter = HostLimiter('wiki.test', rate=20, max_concurrency=8)
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release(0.01, 429)
+        self.assertEqual(limiter.rate, 10)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_successes_raise_rate_additively(self):
+        limiter = HostLimiter('wiki.test', rate=10, max_concurrency=4)
+        limiter.limit = 2.0
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(0.01, 200)
+        # Each success adds RATE_INCREASE / rate
+        self.assertTrue(11.5 < limiter.rate < 12)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_rising_latency_lowers_concurrency(self):
+        limiter = HostLimiter('wiki.test', rate=100, max_concurrency=8)
+        limiter.acquire()
+        limiter.release(0.01, 200)
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(2.0, 200)
+        self.assertLess(limiter.limit, 8)
+
+    def test_token_bucket_spaces_requests(self):
+        limiter = HostLimiter('wiki.test', rate=50, max_concurrency=1)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+            limiter.release(0.0, 304)
+        # One token in the bucket, then one every 20 ms
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from urllib.parse import urlsplit
+
+REPO_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrape
+from wiki_stub import CATEGORY_PAGE_SIZE, StubWiki
+
+TRINKETS = [f"Trinket {n}" for n in range(1, 3 * CATEGORY_PAGE_SIZE)]
+
+
+def build_wiki():
+    wiki = StubWiki()
+    wiki.add_item('Wasp Driver', 'Grenade', 'Rare', 1000, **{'Stack Size': '3', 'Radius': '5m'})
+    wiki.add_item('Light Impact Grenade', 'Grenade', 'Common', 270, **{'Stack Size': '5', 'Damage': '30'})
+    wiki.add_item('Rusted Gear', 'Loot', 'Common', 640, **{'Stack Size': '10'})
+    # Listed under its old title, which now redirects to the renamed page
+    wiki.redirects['Rusty Gear'] = 'Rusted Gear'
+    wiki.listings['Grenades'] = ['Wasp Driver', 'Light Impact Grenade', 'Rusty Gear']
+    for title in TRINKETS:
+        wiki.add_item(title, 'Trinket', 'Common', 1000, Weight='0.3')
+    wiki.category_members['Category:Trinket'] = TRINKETS
+    return wiki
+
+
+class ScrapeMainTest(unittest.TestCase):
+    """Run scrape.main against a stub wiki on localhost"""
+
+    def setUp(self):
+        self.wiki = build_wiki()
+        self.wiki.start()
+        self.addCleanup(self.wiki.stop)
+        base_url = self.wiki.base_url
+        categories = {'Grenades': f'{base_url}/wiki/Grenades', 'Trinkets': f'{base_url}/wiki/Category:Trinket'}
+        for name, value in (('BASE_URL', base_url), ('API_URL', f'{base_url}/w/api.php'),
+                            ('CATEGORIES', categories), ('http_cache', scrape.HTTPCache(scrape.HTTP_CACHE_DIR))):
+            patcher = mock.patch.object(scrape, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(work_dir)
+
+    def scrape(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            scrape.main(workers=2, parse_workers=1, **kwargs)
+        with open(os.path.join('output', 'items_data.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def items_by_name(self, items_data):
+        return {item['name']: item for items in items_data.values() for item in items}
+
+    def test_full_scrape(self):
+        items = self.items_by_name(self.scrape())
+        self.assertEqual(set(items), {'Wasp Driver', 'Light Impact Grenade', 'Rusty Gear', *TRINKETS})
+        wasp = items['Wasp Driver']
+        self.assertEqual(wasp['category'], 'Grenades')
+        self.assertEqual(wasp['Rarity'], 'Rare')
+        self.assertEqual(wasp['Sell Price'], '1000')
+        self.assertEqual(wasp['normalized'], {'values': {'rarity': 'Rare', 'sell_price': 1000, 'stack_size': 3,
+                                                         'radius': 5},
+                                              'units': {'radius': 'm'}})
+        self.assertEqual(items['Rusty Gear']['category'], 'Loot')
+        self.assertTrue(os.path.exists(os.path.join('output', wasp['image_path'])))
+
+    def test_api_backend_matches_html_backend(self):
+        html_data = self.scrape()
+        shutil.rmtree('output')
+        self.wiki.requests.clear()
+        api_data = self.scrape(backend='api')
+        # Pages read through action=parse are wrapped like the rendered page
+        self.assertEqual(api_data, html_data)
+        # The trinket category takes several continued categorymembers requests
+        member_requests = [path for path in self.wiki.requests if 'list=categorymembers' in path]
+        self.assertEqual(len(member_requests), 3)
+        self.assertFalse(any(path.startswith('/wiki/') for path in self.wiki.requests))
+
+    def test_incremental_scrape_fetches_only_changed_pages(self):
+        self.scrape()
+        self.wiki.edit_item('Wasp Driver', Radius='6m')
+        self.wiki.requests.clear()
+        items = self.items_by_name(self.scrape(incremental=True))
+        # The redirected title resolves to its target's revision, so it is
+        # not mistaken for a changed page
+        self.assertEqual(self.wiki.item_page_requests(), ['Wasp Driver'])
+        self.assertEqual(items['Wasp Driver']['Radius'], '6m')
+        self.assertEqual(items['Wasp Driver']['revision_id'], 2)
+        self.assertEqual(len(items), 3 + len(TRINKETS))
+
+    def test_incremental_scrape_revalidates_images(self):
+        first = self.items_by_name(self.scrape())
+        self.wiki.images[self.wiki.items['Trinket 1']['image']] = b're-uploaded image'
+        second = self.items_by_name(self.scrape(incremental=True))
+        self.assertNotEqual(second['Trinket 1']['image_path'], first['Trinket 1']['image_path'])
+        self.assertEqual(second['Trinket 2']['image_path'], first['Trinket 2']['image_path'])
+        with open(os.path.join('output', second['Trinket 1']['image_path']), 'rb') as f:
+            self.assertEqual(f.read(), b're-uploaded image')
+
+    def test_no_cache_applies_to_one_run_only(self):
+        cache = scrape.http_cache
+        self.scrape(use_cache=False)
+        self.assertIs(scrape.http_cache, cache)
+        self.assertEqual(cache.hits + cache.misses, 0)
+        self.scrape()
+        self.scrape()
+        self.assertGreater(cache.hits, 0)
+
+    def test_run_report(self):
+        self.scrape()
+        with open(os.path.join('output', 'run_report.json'), 'r', encoding='utf-8') as f:
+            report = json.load(f)['scrape']
+        requests_by_kind = report['counters']['requests']
+        self.assertEqual(requests_by_kind['image'], 3 + len(TRINKETS))
+        self.assertEqual(sum(requests_by_kind.values()), len(self.wiki.requests))
+        self.assertEqual(report['counters']['status'], {'200': len(self.wiki.requests)})
+        self.assertEqual(report['timings']['request page']['count'], requests_by_kind['page'])
+        self.assertEqual(report['timings']['parse page']['count'], 3 + len(TRINKETS))
+        self.assertEqual(report['values']['images']['downloaded'], 3 + len(TRINKETS))
+        self.assertEqual(report['values']['items'], 3 + len(TRINKETS))
+
+    def test_images_are_revalidated_without_the_http_cache(self):
+        self.scrape(use_cache=False)
+        self.scrape(use_cache=False)
+        with open(os.path.join('output', 'run_report.json'), 'r', encoding='utf-8') as f:
+            images = json.load(f)['scrape']['values']['images']
+        self.assertEqual(images['reused'], 3 + len(TRINKETS))
+        self.assertEqual(images['downloaded'], 0)
+
+    def test_unexpected_304_is_not_stored_as_an_empty_image(self):
+        images_dir = os.path.abspath('images')
+        os.makedirs(images_dir)
+        response = mock.Mock(status_code=304, content=b'', headers={})
+        session = mock.Mock(**{'get.return_value': response})
+        with mock.patch.object(scrape, 'get_session', return_value=session), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(scrape.download_image(f'{self.wiki.base_url}/images/new.png', images_dir))
+        self.assertIn('304', output.getvalue())
+        self.assertEqual(scrape.get_image_store(images_dir).downloaded, 0)
+        self.assertEqual(os.listdir(images_dir), [])
+
+    def test_throttled_requests_are_retried(self):
+        self.wiki.throttle_every = 12
+        self.wiki.delay = 0.01
+        started = time.monotonic()
+        items = self.items_by_name(self.scrape())
+        self.assertEqual(len(items), 3 + len(TRINKETS))
+        self.assertTrue(all('image_path' in item for item in items.values()))
+        limiter = scrape.fetch_scheduler.limiter(urlsplit(self.wiki.base_url).netloc)
+        self.assertGreater(self.wiki.throttled, 0)
+        self.assertEqual(limiter.statuses[429], self.wiki.throttled)
+        self.assertEqual(limiter.retries, self.wiki.throttled)
+        self.assertEqual(limiter.failures, 0)
+        # Retry-After: 1 held the host back at least once
+        self.assertGreaterEqual(time.monotonic() - started, 1.0)
+        self.assertLess(limiter.rate, scrape.DEFAULT_RATE)
+
+
+if __name__ == '__main__':
+    unittest.main()
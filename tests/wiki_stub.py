@@ -0,0 +1,203 @@
+"""
+In-memory stand-in for the Arc Raiders wiki, served over HTTP on localhost.
+Serves rendered article pages, item images and the parts of api.php the
+scraper uses, and records every request so tests can tell what was fetched.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+# Members returned per list=categorymembers request, small enough that a
+# category needs several continued requests
+CATEGORY_PAGE_SIZE = 5
+
+
+class StubWiki:
+    """Pages, revisions and images of a fake wiki, plus a log of requests"""
+
+    def __init__(self):
+        self.items = {}
+        self.listings = {}
+        self.category_members = {}
+        self.redirects = {}
+        self.revisions = {}
+        self.images = {}
+        self.requests = []
+        # Failure injection: answer every Nth request with 429 (0 for none),
+        # and delay every answer by this many seconds
+        self.throttle_every = 0
+        self.retry_after = '1'
+        self.delay = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        handler = type('Handler', (StubWikiHandler,), {'wiki': self})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_item(self, title, tag, rarity, sell_price, **infobox):
+        """Add an item page with its own image, at revision 1"""
+        image = f"/images/{quote(title.replace(' ', '_'))}.png"
+        self.items[title] = {'tag': tag, 'rarity': rarity, 'sell_price': sell_price,
+                             'image': image, 'infobox': infobox}
+        self.images[image] = f"image of {title}".encode('utf-8')
+        self.revisions[title] = 1
+
+    def edit_item(self, title, **infobox):
+        """Change an item's infobox and give its page a new revision"""
+        self.items[title]['infobox'].update(infobox)
+        self.revisions[title] += 1
+
+    def log(self, path):
+        with self._lock:
+            self.requests.append(path)
+
+    def take_throttle(self):
+        """Whether to answer the current request with 429 Too Many Requests"""
+        with self._lock:
+            if not self.throttle_every or len(self.requests) % self.throttle_every:
+                return False
+            self.throttled += 1
+            return True
+
+    def item_page_requests(self):
+        """Titles of the item pages fetched so far, by either backend"""
+        with self._lock:
+            return [title for title in (request_title(path) for path in self.requests)
+                    if title in self.items or title in self.redirects]
+
+    def resolve(self, title):
+        return self.redirects.get(title, title)
+
+    def parser_output(self, title):
+        """Rendered page content the way action=parse returns it, or None"""
+        title = self.resolve(title)
+        if title in self.items:
+            item = self.items[title]
+            rows = ''.join(f'<tr><th>{key}</th><td>{value}</td></tr>' for key, value in item['infobox'].items())
+            body = (
+                '<table class="infobox">'
+                f'<tr><td><span style="background: linear-gradient(red, blue)"><img src="{item["image"]}"></span></td></tr>'
+                f'<tr class="data-tag data-tag-{item["rarity"].lower()}"><td>{item["rarity"]}</td></tr>'
+                f'<tr class="data-tag"><td>{item["tag"]}</td></tr>'
+                f'<tr><th>Sell Price</th><td><div class="template-price">{item["sell_price"]:,}</div></td></tr>'
+                f'{rows}</table>'
+            )
+        elif title in self.listings:
+            rows = ''.join(f'<tr><td>{article_link(name)}</td></tr>' for name in self.listings[title])
+            body = f'<table class="wikitable"><tr><th>Name</th></tr>{rows}</table>'
+        else:
+            return None
+        return f'<div class="mw-parser-output">{body}</div>'
+
+    def article_html(self, title):
+        """Full rendered article, skin included, or None for unknown pages"""
+        if title in self.category_members:
+            links = ''.join(f'<li>{article_link(name)}</li>' for name in self.category_members[title])
+            return ('<html><body><div id="mw-navigation"><a href="/wiki/Main_Page">Main Page</a></div>'
+                    f'<div id="mw-content-text"></div><div id="mw-pages"><ul>{links}</ul></div></body></html>')
+        content = self.parser_output(title)
+        if content is None:
+            return None
+        return ('<html><body><div id="mw-navigation"><a href="/wiki/Main_Page">Main Page</a></div>'
+                f'<div id="mw-content-text">{content}</div></body></html>')
+
+    def api(self, params):
+        if params.get('list') == 'categorymembers':
+            members = self.category_members.get(params['cmtitle'], [])
+            start = int(params.get('cmcontinue') or 0)
+            end = start + CATEGORY_PAGE_SIZE
+            data = {'query': {'categorymembers': [{'ns': 0, 'title': title} for title in members[start:end]]}}
+            if end < len(members):
+                data['continue'] = {'cmcontinue': str(end), 'continue': '-||'}
+            return data
+        if params.get('prop') == 'revisions':
+            query = {'pages': []}
+            for title in params['titles'].split('|'):
+                if params.get('redirects') and title in self.redirects:
+                    query.setdefault('redirects', []).append({'from': title, 'to': self.redirects[title]})
+                    title = self.redirects[title]
+                if title in self.revisions:
+                    query['pages'].append({'ns': 0, 'title': title, 'revisions': [{'revid': self.revisions[title]}]})
+                else:
+                    query['pages'].append({'ns': 0, 'title': title, 'missing': True})
+            return {'batchcomplete': True, 'query': query}
+        if params.get('action') == 'parse':
+            text = self.parser_output(params['page'])
+            if text is None:
+                return {'error': {'code': 'missingtitle', 'info': "The page you specified doesn't exist."}}
+            return {'parse': {'title': self.resolve(params['page']), 'text': text}}
+        return {'error': {'code': 'badvalue', 'info': 'Unsupported request.'}}
+
+
+class StubWikiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wiki = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        self.wiki.log(path + ('?' + parts.query if parts.query else ''))
+        if self.wiki.take_throttle():
+            self.send_response(429)
+            self.send_header('Retry-After', self.wiki.retry_after)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        time.sleep(self.wiki.delay)
+        if path == '/w/api.php':
+            params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            return self.send_body(json.dumps(self.wiki.api(params)).encode('utf-8'), 'application/json')
+        if path.startswith('/images/') and parts.path in self.wiki.images:
+            return self.send_body(self.wiki.images[parts.path], 'image/png')
+        if path.startswith('/wiki/'):
+            html = self.wiki.article_html(path[len('/wiki/'):].replace('_', ' '))
+            if html is not None:
+                return self.send_body(html.encode('utf-8'), 'text/html; charset=UTF-8')
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_body(self, body, content_type):
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def article_link(title):
+    return f'<a href="/wiki/{quote(title.replace(" ", "_"))}">{title}</a>'
+
+
+def request_title(path):
+    """Page title of a logged article or action=parse request, or None"""
+    if path.startswith('/wiki/'):
+        return path[len('/wiki/'):].replace('_', ' ')
+    parts = urlsplit(path)
+    params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+    if parts.path == '/w/api.php' and params.get('action') == 'parse':
+        return params['page']
+    return None
@@ -0,0 +1,86 @@
+import hashlib
+import io
+import os
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# .item-image is rendered at 120x120 CSS pixels; 2x covers high-density screens
+THUMBNAIL_SIZE = 120
+THUMBNAIL_SCALES = (1, 2)
+THUMBNAIL_QUALITY = 80
+
+# Leading bytes identifying the formats the wiki serves
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+def detect_image_mime(data):
+    """Detect an image's MIME type from its content rather than its filename"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mime in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    return 'application/octet-stream'
+
+def make_thumbnails(image_path, cache_dir):
+    """Return {scale: (mime, bytes)} display-size renditions of an image
+
+    Renditions are WebP images fitted into THUMBNAIL_SIZE * scale pixels and
+    cached in cache_dir under the SHA-256 of the source bytes, so an image is
+    only transcoded when it is new or has changed. Without Pillow, or when the
+    renditions would not be smaller than the source, the original bytes are
+    returned as the 1x rendition with their real MIME type. Returns None if
+    the image cannot be read.
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print(f"Error loading image {image_path}: {e}")
+        return None
+
+    if Image is None:
+        return {1: (detect_image_mime(data), data)}
+
+    digest = hashlib.sha256(data).hexdigest()
+    renditions = {}
+    source = None
+    for scale in THUMBNAIL_SCALES:
+        cache_path = os.path.join(cache_dir, f"{digest}-{THUMBNAIL_SIZE * scale}.webp")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                renditions[scale] = ('image/webp', f.read())
+            continue
+
+        if source is None:
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    source = image.convert('RGBA')
+            except Exception as e:
+                print(f"Error transcoding image {image_path}: {e}")
+                return {1: (detect_image_mime(data), data)}
+        thumbnail = source.copy()
+        # Never upscale: a small source is re-encoded at its own size
+        thumbnail.thumbnail((THUMBNAIL_SIZE * scale, THUMBNAIL_SIZE * scale), Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'WEBP', quality=THUMBNAIL_QUALITY)
+        encoded = buffer.getvalue()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, cache_path)
+        renditions[scale] = ('image/webp', encoded)
+
+    # Already-small sources are embedded as they are
+    if sum(len(encoded) for _, encoded in renditions.values()) >= len(data):
+        return {1: (detect_image_mime(data), data)}
+    return renditions